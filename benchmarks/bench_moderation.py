@@ -0,0 +1,56 @@
+"""
+Moderation throughput benchmark (texts per second, single core).
+
+Compares calling moderate_content once per text with HashedNgramModel.classify
+on micro-batches of several sizes, over a synthetic mix of short and long texts.
+
+Usage:
+    python -m benchmarks.bench_moderation [--texts 20000] [--bits 20]
+"""
+import argparse
+import logging
+import random
+import time
+
+from src.processor.moderation import moderate_content
+from src.processor.scoring import HashedNgramModel
+
+WORDS = "the quick brown fox jumps over lazy dog hello world moderation content badword review".split()
+
+
+def make_texts(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    # Mostly short posts with a tail of long ones
+    return [
+        " ".join(rng.choices(WORDS, k=rng.choice([5, 10, 20, 40, 200])))
+        for _ in range(count)
+    ]
+
+
+def bench(fn, texts: list[str], batch_size: int) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        fn(texts[i : i + batch_size])
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=20_000)
+    parser.add_argument("--bits", type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    texts = make_texts(args.texts)
+    model = HashedNgramModel.from_keywords({"badword": 10.0}, bits=args.bits)
+    model.weights[:] = 0.01  # non-sparse weights so every lookup is a real memory read
+
+    rate = bench(lambda batch: [moderate_content(t) for t in batch], texts, 1)
+    print(f"moderate_content (per text):   {rate:>10,.0f} texts/s")
+    for batch_size in (1, 8, 32, 128, 512):
+        rate = bench(model.classify, texts, batch_size)
+        print(f"ngram classify (batch={batch_size:>3}):   {rate:>10,.0f} texts/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Rate limiter backend benchmark.
+
+Compares checks per second for:
+- memory: TokenBucket (per-process dict, does not share limits across workers)
+- shm:    SharedMemoryTokenBucket, single process and N concurrent processes
+- redis:  a Lua token bucket, one round trip per check (skipped if REDIS_URL is unreachable)
+
+Usage:
+    python -m benchmarks.bench_rate_limiter [--checks 200000] [--users 10000] [--processes 4]
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+
+from src.api.rate_limiter import SharedMemoryTokenBucket, TokenBucket
+from src.common.config import settings
+
+# Reference Redis backend: same refill semantics as TokenBucket
+REDIS_TOKEN_BUCKET = """
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local capacity = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) / interval)
+local limited = 1
+if tokens >= 1 then
+    tokens = tokens - 1
+    limited = 0
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], 3600)
+return limited
+"""
+
+
+def _run(check, checks: int, users: int) -> float:
+    keys = [f"user-{i}" for i in range(users)]
+    start = time.perf_counter()
+    for i in range(checks):
+        check(keys[i % users])
+    return checks / (time.perf_counter() - start)
+
+
+def _shm_worker(path: str, checks: int, users: int, results) -> None:
+    logging.disable(logging.WARNING)
+    limiter = SharedMemoryTokenBucket(tokens_per_minute=600, capacity=10, path=path)
+    results.put(_run(limiter.check_and_apply_rate_limit, checks, users))
+
+
+def bench_memory(checks: int, users: int) -> float:
+    return _run(TokenBucket(tokens_per_minute=600, capacity=10).check_and_apply_rate_limit, checks, users)
+
+
+def bench_shm(path: str, checks: int, users: int) -> float:
+    limiter = SharedMemoryTokenBucket(tokens_per_minute=600, capacity=10, path=path)
+    try:
+        return _run(limiter.check_and_apply_rate_limit, checks, users)
+    finally:
+        limiter.close()
+
+
+def bench_shm_processes(path: str, checks: int, users: int, processes: int) -> float:
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_shm_worker, args=(path, checks, users, results)) for _ in range(processes)]
+    for proc in procs:
+        proc.start()
+    total = sum(results.get() for _ in procs)
+    for proc in procs:
+        proc.join()
+    return total
+
+
+def bench_redis(checks: int, users: int) -> float | None:
+    try:
+        import redis
+
+        client = redis.Redis.from_url(settings.redis_url, socket_connect_timeout=1)
+        client.ping()
+    except Exception as e:
+        print(f"redis:            skipped ({e})")
+        return None
+    script = client.register_script(REDIS_TOKEN_BUCKET)
+
+    def check(user_id: str) -> bool:
+        return bool(script(keys=[f"bench:rl:{user_id}"], args=[10, 0.1, time.time()]))
+
+    return _run(check, checks, users)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checks", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--processes", type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+    # Rejections log a warning; keep logging out of the measurement
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rate-limit")
+        print(f"memory (1 proc):  {bench_memory(args.checks, args.users):>12,.0f} checks/s")
+        print(f"shm (1 proc):     {bench_shm(path, args.checks, args.users):>12,.0f} checks/s")
+        total = bench_shm_processes(path, args.checks, args.users, args.processes)
+        print(f"shm ({args.processes} procs):    {total:>12,.0f} checks/s aggregate")
+    redis_rate = bench_redis(min(args.checks, 20_000), args.users)
+    if redis_rate is not None:
+        print(f"redis (1 proc):   {redis_rate:>12,.0f} checks/s")
+
+
+if __name__ == "__main__":
+    main()
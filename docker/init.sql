@@ -1,7 +1,11 @@
 -- Content moderation database schema
+-- Every statement is idempotent, so the script can be re-applied to upgrade an
+-- existing database (docker-entrypoint-initdb.d only runs it on an empty volume).
 CREATE TABLE IF NOT EXISTS content (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     user_id VARCHAR(255) NOT NULL,
+    tenant_id VARCHAR(255), -- webhook subscriptions are per tenant
+    lane VARCHAR(50), -- priority lane the submission was published to
     text TEXT NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
@@ -12,5 +16,14 @@ CREATE TABLE IF NOT EXISTS moderation_results (
     moderated_at TIMESTAMP WITH TIME ZONE
 );
 
+-- Upgrade: tables created before tenants existed
+ALTER TABLE content ADD COLUMN IF NOT EXISTS tenant_id VARCHAR(255);
+-- Upgrade: tables created before lanes were stored
+ALTER TABLE content ADD COLUMN IF NOT EXISTS lane VARCHAR(50);
+
 CREATE INDEX IF NOT EXISTS idx_content_user_id ON content(user_id);
 CREATE INDEX IF NOT EXISTS idx_content_created_at ON content(created_at);
+
+-- Partial index for the PENDING reconciliation sweeper
+CREATE INDEX IF NOT EXISTS idx_moderation_results_pending ON moderation_results(content_id)
+    WHERE status = 'PENDING';
@@ -0,0 +1,110 @@
+"""Single-flight request coalescing for concurrent lookups."""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the callers-per-query histogram buckets
+FANOUT_BUCKETS = (1, 2, 5, 10, 50, 100, 1000)
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one in-flight call.
+
+    - The first caller for a key starts the call; later callers await the same result.
+    - The shared call runs in its own task, so a cancelled caller does not cancel it.
+    - Results are not cached: once the call finishes, the next caller starts a new one.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._callers: Dict[Hashable, int] = {}
+        self.queries = 0
+        self.callers = 0
+        self.max_fanout = 0
+        self._fanout_histogram = [0] * (len(FANOUT_BUCKETS) + 1)
+
+    def _record(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        fanout = self._callers.pop(key, 1)
+        self.queries += 1
+        self.callers += fanout
+        self.max_fanout = max(self.max_fanout, fanout)
+        bucket = next((i for i, b in enumerate(FANOUT_BUCKETS) if fanout <= b), len(FANOUT_BUCKETS))
+        self._fanout_histogram[bucket] += 1
+        if not future.cancelled() and future.exception() is not None:
+            logger.debug("Coalesced %s lookup for %s failed: %s", self.name, key, future.exception())
+
+    def _start(self, key: Hashable, future: asyncio.Future) -> None:
+        self._inflight[key] = future
+        self._callers[key] = 0
+        future.add_done_callback(lambda f, key=key: self._record(key, f))
+
+    def _join(self, key: Hashable) -> asyncio.Future:
+        self._callers[key] += 1
+        return self._inflight[key]
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Return fn()'s result, sharing it with concurrent callers for key."""
+        if key not in self._inflight:
+            self._start(key, asyncio.ensure_future(fn()))
+        return await asyncio.shield(self._join(key))
+
+    async def do_many(
+        self,
+        keys: Iterable[Hashable],
+        fetch_many: Callable[[list], Awaitable[Dict[Hashable, Any]]],
+    ) -> Dict[Hashable, Any]:
+        """
+        Bulk variant of do().
+
+        Keys already in flight join the existing calls; the remaining keys are
+        fetched with one fetch_many(missing) call that concurrent do() and
+        do_many() callers can join per key. Keys missing from fetch_many's
+        result map to None.
+        """
+        keys = list(dict.fromkeys(keys))
+        missing = [key for key in keys if key not in self._inflight]
+        if missing:
+            batch = asyncio.ensure_future(fetch_many(missing))
+
+            async def pick(key: Hashable) -> Any:
+                return (await batch).get(key)
+
+            for key in missing:
+                self._start(key, asyncio.ensure_future(pick(key)))
+
+        futures = [self._join(key) for key in keys]
+        results = await asyncio.shield(asyncio.gather(*futures))
+        return dict(zip(keys, results))
+
+    def stats(self) -> dict:
+        """Queries executed vs. callers served, and callers-per-query histogram."""
+        labels = [f"le_{b}" for b in FANOUT_BUCKETS] + ["gt_" + str(FANOUT_BUCKETS[-1])]
+        return {
+            "queries": self.queries,
+            "callers": self.callers,
+            "collapsed": self.callers - self.queries,
+            "max_fanout": self.max_fanout,
+            "in_flight": len(self._inflight),
+            "fanout_histogram": dict(zip(labels, self._fanout_histogram)),
+        }
+
+
+_single_flights: Dict[str, SingleFlight] = {}
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Get or create the process-wide SingleFlight for name."""
+    if name not in _single_flights:
+        _single_flights[name] = SingleFlight(name)
+    return _single_flights[name]
+
+
+def coalescing_stats() -> dict:
+    """Stats of every SingleFlight in this process."""
+    return {name: sf.stats() for name, sf in _single_flights.items()}
@@ -0,0 +1,96 @@
+"""Background health monitor for the API's dependencies."""
+import asyncio
+import logging
+import time
+
+from src.api.message_queue import check_redis_health, redis_circuit_breaker
+from src.common.config import settings
+from src.common.database import check_db_health, db_circuit_breaker
+
+logger = logging.getLogger(__name__)
+
+
+async def _probe(check) -> bool:
+    try:
+        return await asyncio.wait_for(check(), settings.health_check_timeout_seconds)
+    except asyncio.TimeoutError:
+        return False
+
+
+class HealthMonitor:
+    """
+    Probes Postgres and Redis on an interval and caches the result.
+
+    Probe results are fed to the circuit breakers, so a successful probe
+    closes an open circuit without waiting for user traffic.
+    """
+
+    def __init__(self, interval: float | None = None):
+        self.interval = interval or settings.health_check_interval_seconds
+        self.database_ok: bool | None = None
+        self.redis_ok: bool | None = None
+        self.checked_at: float | None = None
+        self._task: asyncio.Task | None = None
+
+    async def probe_once(self) -> None:
+        self.database_ok, self.redis_ok = await asyncio.gather(
+            _probe(check_db_health), _probe(check_redis_health)
+        )
+        self.checked_at = time.time()
+        for ok, breaker in (
+            (self.database_ok, db_circuit_breaker),
+            (self.redis_ok, redis_circuit_breaker),
+        ):
+            if ok:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.probe_once()
+            except Exception as e:
+                logger.exception("Health probe failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def report(self) -> dict:
+        """Cached health; probes inline only if no probe has completed yet."""
+        if self.checked_at is None:
+            await self.probe_once()
+        healthy = self.database_ok and self.redis_ok
+        return {
+            "status": "healthy" if healthy else "unhealthy",
+            "database": "ok" if self.database_ok else "error",
+            "redis": "ok" if self.redis_ok else "error",
+            "checkedAt": self.checked_at,
+            "circuits": {
+                "database": db_circuit_breaker.snapshot(),
+                "redis": redis_circuit_breaker.snapshot(),
+            },
+        }
+
+
+# Global health monitor instance
+_health_monitor: HealthMonitor | None = None
+
+
+def get_health_monitor() -> HealthMonitor:
+    """Get or create the global health monitor."""
+    global _health_monitor
+    if _health_monitor is None:
+        _health_monitor = HealthMonitor()
+    return _health_monitor
@@ -0,0 +1,255 @@
+"""Idempotency-Key support for content submission."""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+from redis.exceptions import RedisError
+
+from src.api.message_queue import get_redis, redis_circuit_breaker
+from src.common.circuit_breaker import CircuitOpenError
+from src.common.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "idempotency"
+# How often a concurrent duplicate re-checks the first request's record
+POLL_INTERVAL = 0.05
+
+# Replace or delete KEYS[1] only while it is still claimed by token ARGV[1]
+_COMPLETE_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if current and cjson.decode(current)['token'] == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if current and cjson.decode(current)['token'] == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return 1
+end
+return 0
+"""
+
+
+class IdempotentReplay(Exception):
+    """The key's request already completed; answer with its stored response."""
+
+    def __init__(self, status_code: int, body: Any):
+        super().__init__(f"Replaying stored {status_code} response")
+        self.status_code = status_code
+        self.body = body
+
+
+class IdempotencyInProgress(Exception):
+    """A request with the same key is still running after the wait timeout."""
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used for a request with a different body."""
+
+
+class InMemoryIdempotencyStore:
+    """
+    Per-process idempotency records.
+
+    Stand-in for Redis in single-process deployments and tests; records
+    expire lazily and in a full sweep every SWEEP_EVERY claims.
+    """
+
+    SWEEP_EVERY = 1024
+
+    def __init__(self):
+        self._records: Dict[str, tuple[dict, float]] = {}  # key -> (record, expires_at)
+        self._claims = 0
+
+    def _get(self, key: str) -> dict | None:
+        entry = self._records.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._records[key]
+            return None
+        return entry[0]
+
+    def _sweep(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, (_, expires_at) in self._records.items() if expires_at <= now]:
+            del self._records[key]
+
+    async def claim(self, key: str, record: dict, ttl: float) -> bool:
+        self._claims += 1
+        if self._claims % self.SWEEP_EVERY == 0:
+            self._sweep()
+        if self._get(key) is not None:
+            return False
+        self._records[key] = (record, time.monotonic() + ttl)
+        return True
+
+    async def get(self, key: str) -> dict | None:
+        return self._get(key)
+
+    async def complete(self, key: str, token: str, record: dict, ttl: float) -> bool:
+        current = self._get(key)
+        if current is None or current.get("token") != token:
+            return False
+        self._records[key] = (record, time.monotonic() + ttl)
+        return True
+
+    async def release(self, key: str, token: str) -> bool:
+        current = self._get(key)
+        if current is None or current.get("token") != token:
+            return False
+        del self._records[key]
+        return True
+
+
+class RedisIdempotencyStore:
+    """
+    Idempotency records in Redis, shared by every API instance.
+
+    - claim is SET NX PX, so exactly one request wins a key.
+    - complete and release are Lua compare-and-set on the claim token, so a
+      request whose claim expired cannot overwrite a newer claim.
+    - Calls go through the Redis circuit breaker.
+    """
+
+    async def claim(self, key: str, record: dict, ttl: float) -> bool:
+        client = await get_redis()
+        return bool(
+            await redis_circuit_breaker.call(
+                client.set, key, json.dumps(record), nx=True, px=int(ttl * 1000)
+            )
+        )
+
+    async def get(self, key: str) -> dict | None:
+        client = await get_redis()
+        value = await redis_circuit_breaker.call(client.get, key)
+        return json.loads(value) if value is not None else None
+
+    async def complete(self, key: str, token: str, record: dict, ttl: float) -> bool:
+        client = await get_redis()
+        return bool(
+            await redis_circuit_breaker.call(
+                client.eval, _COMPLETE_SCRIPT, 1, key, token, json.dumps(record), int(ttl * 1000)
+            )
+        )
+
+    async def release(self, key: str, token: str) -> bool:
+        client = await get_redis()
+        return bool(await redis_circuit_breaker.call(client.eval, _RELEASE_SCRIPT, 1, key, token))
+
+
+IdempotencyStore = InMemoryIdempotencyStore | RedisIdempotencyStore
+
+# Store failures that make submit proceed without idempotency
+STORE_UNAVAILABLE_ERRORS = (RedisError, OSError, asyncio.TimeoutError, CircuitOpenError)
+
+
+def request_fingerprint(body: Any) -> str:
+    """Hash of the request body, to detect a key reused for a different request."""
+    return hashlib.sha256(body.model_dump_json().encode()).hexdigest()
+
+
+@dataclass
+class IdempotencyClaim:
+    """
+    An Idempotency-Key claimed by the current request.
+
+    The handler sets response to (status_code, body); the idempotency
+    dependency stores it once the request has fully succeeded.
+    """
+
+    store: IdempotencyStore
+    key: str
+    token: str
+    fingerprint: str
+    response: tuple[int, Any] | None = field(default=None, compare=False)
+
+    async def complete(self, status_code: int, body: Any) -> None:
+        """Store the response for replay (idempotency_ttl_seconds)."""
+        record = {
+            "token": self.token,
+            "fingerprint": self.fingerprint,
+            "statusCode": status_code,
+            "body": body,
+        }
+        try:
+            if not await self.store.complete(
+                self.key, self.token, record, settings.idempotency_ttl_seconds
+            ):
+                logger.warning("Idempotency claim for %s expired before completion", self.key)
+        except STORE_UNAVAILABLE_ERRORS as e:
+            logger.warning("Could not store idempotent response for %s: %s", self.key, e)
+
+    async def release(self) -> None:
+        """Drop the claim so a retry of the failed request can run."""
+        try:
+            await self.store.release(self.key, self.token)
+        except STORE_UNAVAILABLE_ERRORS as e:
+            logger.warning("Could not release idempotency key %s: %s", self.key, e)
+
+
+async def claim_idempotency_key(
+    store: IdempotencyStore,
+    key: str,
+    fingerprint: str,
+    timeout: float | None = None,
+) -> IdempotencyClaim | None:
+    """
+    Claim key for the current request.
+
+    Returns:
+        The claim, or None if the store is unavailable (the request then
+        proceeds without idempotency).
+
+    Raises:
+        IdempotentReplay: The key's request completed; replay its response.
+        IdempotencyInProgress: The key's request is still running after timeout.
+        IdempotencyKeyReused: The key belongs to a request with another body.
+    """
+    key = f"{KEY_PREFIX}:{key}"
+    timeout = timeout if timeout is not None else settings.idempotency_wait_timeout_seconds
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            pending = {"token": token, "fingerprint": fingerprint}
+            if await store.claim(key, pending, settings.idempotency_lock_ttl_seconds):
+                return IdempotencyClaim(store, key, token, fingerprint)
+
+            record = await store.get(key)
+            if record is None:
+                continue  # released or expired in between; claim again
+            if record.get("fingerprint") != fingerprint:
+                raise IdempotencyKeyReused("Idempotency-Key was already used for a different request")
+            if "statusCode" in record:
+                raise IdempotentReplay(record["statusCode"], record["body"])
+            if time.monotonic() >= deadline:
+                raise IdempotencyInProgress("A request with this Idempotency-Key is still in progress")
+            await asyncio.sleep(POLL_INTERVAL)
+    except STORE_UNAVAILABLE_ERRORS as e:
+        logger.warning("Idempotency store unavailable, proceeding without it: %s", e)
+        return None
+
+
+_idempotency_store: IdempotencyStore | None = None
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    """Get or create the global idempotency store (idempotency_backend: redis or memory)."""
+    global _idempotency_store
+    if _idempotency_store is None:
+        if settings.idempotency_backend == "memory":
+            _idempotency_store = InMemoryIdempotencyStore()
+        else:
+            _idempotency_store = RedisIdempotencyStore()
+    return _idempotency_store
@@ -2,13 +2,19 @@
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from src.api.message_queue import check_redis_health, close_redis
+from src.api.coalescing import coalescing_stats
+from src.api.health import get_health_monitor
+from src.api.idempotency import IdempotentReplay
+from src.api.message_queue import close_redis
+from src.api.routers.admin import router as admin_router
 from src.api.routers.content import router as content_router
+from src.common.circuit_breaker import CircuitOpenError
 from src.common.config import settings
-from src.common.database import check_db_health
+from src.common.instrumentation import get_loop_monitor
 
 logging.basicConfig(
     level=logging.INFO,
@@ -20,7 +26,12 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan: startup and shutdown."""
+    monitor = get_health_monitor()
+    monitor.start()
+    get_loop_monitor().start()
     yield
+    await get_loop_monitor().stop()
+    await monitor.stop()
     await close_redis()
     logger.info("API service shutting down")
 
@@ -41,19 +52,39 @@ app.add_middleware(
 )
 
 app.include_router(content_router)
+app.include_router(admin_router)
+
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError) -> JSONResponse:
+    """Fail fast with 503 while a dependency's circuit is open."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service temporarily unavailable."},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+    )
+
+
+@app.exception_handler(IdempotentReplay)
+async def idempotent_replay_handler(request: Request, exc: IdempotentReplay) -> JSONResponse:
+    """Answer a repeated Idempotency-Key with the original response."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content=exc.body,
+        headers={"Idempotent-Replayed": "true"},
+    )
 
 
 @app.get("/health")
 async def health():
-    """Health check endpoint for Docker and load balancers."""
-    db_ok = await check_db_health()
-    redis_ok = await check_redis_health()
-    status = "healthy" if (db_ok and redis_ok) else "unhealthy"
-    return {
-        "status": status,
-        "database": "ok" if db_ok else "error",
-        "redis": "ok" if redis_ok else "error",
-    }
+    """Health check endpoint for Docker and load balancers, served from the background monitor."""
+    return await get_health_monitor().report()
+
+
+@app.get("/metrics")
+async def metrics():
+    """In-process API metrics (per worker process)."""
+    return {"coalescing": coalescing_stats(), "event_loop": get_loop_monitor().snapshot()}
 
 
 if __name__ == "__main__":
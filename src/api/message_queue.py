@@ -1,17 +1,22 @@
 """Redis message queue for event publishing."""
 import json
 import logging
+import time
 import uuid
 from typing import Any
 
 import redis.asyncio as redis
 
+from src.common.circuit_breaker import CircuitBreaker, CircuitOpenError
 from src.common.config import settings
+from src.common.lanes import stream_for_lane
 
 logger = logging.getLogger(__name__)
 
 _redis_client: redis.Redis | None = None
 
+redis_circuit_breaker = CircuitBreaker("redis")
+
 
 async def get_redis() -> redis.Redis:
     """Get or create Redis connection."""
@@ -21,6 +26,8 @@ async def get_redis() -> redis.Redis:
             settings.redis_url,
             encoding="utf-8",
             decode_responses=True,
+            socket_timeout=settings.redis_socket_timeout_seconds,
+            socket_connect_timeout=settings.redis_socket_timeout_seconds,
         )
     return _redis_client
 
@@ -29,31 +36,86 @@ async def publish_content_submitted(
     content_id: uuid.UUID,
     text: str,
     user_id: str,
+    lane: str | None = None,
+    tenant_id: str | None = None,
 ) -> None:
     """
-    Publish ContentSubmitted event to the message queue.
+    Append a ContentSubmitted event to the stream of its priority lane.
+
+    Raises CircuitOpenError without touching Redis while its circuit is open.
 
-    Event payload: {"contentId": "<UUID>", "text": "<content_text>", "userId": "<user_id>"}
+    Event payload: {"contentId": "<UUID>", "text": "<content_text>", "userId": "<user_id>",
+                    "lane": "<lane>", "submittedAt": <epoch_seconds>,
+                    "tenantId": "<tenant_id>" (only if set)}
     """
+    lane = lane or settings.default_priority_lane
     payload = {
         "contentId": str(content_id),
         "text": text,
         "userId": user_id,
+        "lane": lane,
+        "submittedAt": time.time(),
     }
+    if tenant_id is not None:
+        payload["tenantId"] = tenant_id
     try:
         client = await get_redis()
-        channel = settings.moderation_events_channel
-        await client.publish(channel, json.dumps(payload))
+        await redis_circuit_breaker.call(
+            client.xadd,
+            stream_for_lane(lane),
+            {"data": json.dumps(payload)},
+            maxlen=settings.lane_stream_max_length,
+            approximate=True,
+        )
         logger.info(
-            "Published ContentSubmitted event for content_id=%s, user_id=%s",
+            "Published ContentSubmitted event for content_id=%s, user_id=%s, lane=%s",
             content_id,
             user_id,
+            lane,
         )
+    except CircuitOpenError:
+        raise
     except Exception as e:
         logger.exception("Failed to publish ContentSubmitted event: %s", e)
         raise
 
 
+async def publish_inline_verdict(
+    content_id: uuid.UUID,
+    user_id: str,
+    status: str,
+    tenant_id: str,
+    lane: str | None = None,
+) -> None:
+    """
+    Append a verdict reached on the inline fast path to its lane stream.
+
+    The processor does not moderate these events; it only forwards them to
+    the tenant's webhooks.
+
+    Event payload: {"contentId": "<UUID>", "userId": "<user_id>", "tenantId": "<tenant_id>",
+                    "verdict": "APPROVED" | "REJECTED", "lane": "<lane>",
+                    "submittedAt": <epoch_seconds>}
+    """
+    lane = lane or settings.default_priority_lane
+    payload = {
+        "contentId": str(content_id),
+        "userId": user_id,
+        "tenantId": tenant_id,
+        "verdict": status,
+        "lane": lane,
+        "submittedAt": time.time(),
+    }
+    client = await get_redis()
+    await redis_circuit_breaker.call(
+        client.xadd,
+        stream_for_lane(lane),
+        {"data": json.dumps(payload)},
+        maxlen=settings.lane_stream_max_length,
+        approximate=True,
+    )
+
+
 async def check_redis_health() -> bool:
     """Check if Redis connection is healthy."""
     try:
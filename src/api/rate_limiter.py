@@ -1,5 +1,11 @@
 """Token Bucket rate limiter implementation."""
+import fcntl
+import hashlib
 import logging
+import mmap
+import os
+import struct
+import threading
 import time
 from typing import Dict
 
@@ -60,13 +66,151 @@ class TokenBucket:
         return True
 
 
+class SharedMemoryTokenBucket:
+    """
+    Token Bucket rate limiter whose state lives in a memory-mapped file.
+
+    All processes on a host mapping the same file (e.g. uvicorn --workers N)
+    enforce one shared limit per user at in-process speed.
+
+    - The table has a fixed number of buckets of SLOTS_PER_BUCKET slots. A user's
+      64-bit fingerprint picks the bucket; slots are probed linearly within it.
+    - Each bucket is updated under a POSIX byte-range lock covering only that
+      bucket, so workers contend only when they touch the same bucket.
+    - When a bucket is full, a slot that has refilled to capacity (idle user)
+      is reused first, else the least recently refilled slot.
+    - time.monotonic() is CLOCK_MONOTONIC, which is shared by all processes.
+    """
+
+    MAGIC = b"CMRLSHM1"
+    HEADER = struct.Struct("<8sQ")
+    HEADER_SIZE = 64
+    SLOT = struct.Struct("<Qdd")  # fingerprint (0 = empty), tokens, last_refill
+    SLOTS_PER_BUCKET = 8
+
+    def __init__(
+        self,
+        tokens_per_minute: int | None = None,
+        capacity: int | None = None,
+        path: str | None = None,
+        slots: int | None = None,
+    ):
+        self.tokens_per_minute = tokens_per_minute or settings.rate_limit_tokens_per_minute
+        self.capacity = capacity or settings.rate_limit_bucket_capacity
+        self.refill_interval = 60.0 / self.tokens_per_minute
+        self.path = path or settings.rate_limit_shm_path
+        slots = slots or settings.rate_limit_shm_slots
+        self.buckets = max(1, slots // self.SLOTS_PER_BUCKET)
+        self._bucket_size = self.SLOT.size * self.SLOTS_PER_BUCKET
+        self._size = self.HEADER_SIZE + self.buckets * self._bucket_size
+        self._local_lock = threading.Lock()  # POSIX locks do not exclude threads
+        self._fd = self._open_table()
+        self._mm = mmap.mmap(self._fd, self._size)
+
+    def _open_table(self) -> int:
+        """
+        Open the table, creating it if it is missing or laid out differently.
+
+        A table in use is never truncated: other processes may have it mapped,
+        and shrinking it would SIGBUS them. A new table is built in a temporary
+        file and renamed over the path, so processes still mapping the old one
+        keep using it until they restart. Creation is serialized with a lock
+        file, so processes starting together all open the same table.
+        """
+        expected = self.HEADER.pack(self.MAGIC, self.buckets)
+        lock_fd = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+            try:
+                fd = os.open(self.path, os.O_RDWR)
+            except FileNotFoundError:
+                pass
+            else:
+                header = os.pread(fd, self.HEADER.size, 0)
+                if header == expected and os.fstat(fd).st_size == self._size:
+                    return fd
+                os.close(fd)
+            logger.info("Initializing shared rate limit table at %s", self.path)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            fd = os.open(tmp, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+            try:
+                os.ftruncate(fd, self._size)
+                os.pwrite(fd, expected, 0)
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.close(fd)
+                os.unlink(tmp)
+                raise
+            return fd
+        finally:
+            os.close(lock_fd)  # releases the flock
+
+    @staticmethod
+    def _fingerprint(user_id: str) -> int:
+        digest = hashlib.blake2b(user_id.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    def check_and_apply_rate_limit(self, user_id: str) -> bool:
+        """
+        Check if request should be rate-limited.
+
+        Returns:
+            True if rate-limited (should reject), False if allowed.
+        """
+        fingerprint = self._fingerprint(user_id)
+        start = self.HEADER_SIZE + (fingerprint % self.buckets) * self._bucket_size
+        with self._local_lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self._bucket_size, start, os.SEEK_SET)
+            try:
+                limited = self._apply(fingerprint, start)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self._bucket_size, start, os.SEEK_SET)
+        if limited:
+            logger.warning("Rate limit exceeded for user_id=%s", user_id)
+        return limited
+
+    def _apply(self, fingerprint: int, start: int) -> bool:
+        now = time.monotonic()
+        mm = self._mm
+        victim = None
+        victim_refill = float("inf")
+        for i in range(self.SLOTS_PER_BUCKET):
+            offset = start + i * self.SLOT.size
+            fp, tokens, last_refill = self.SLOT.unpack_from(mm, offset)
+            if fp == fingerprint:
+                tokens = min(self.capacity, tokens + (now - last_refill) / self.refill_interval)
+                if tokens >= 1.0:
+                    self.SLOT.pack_into(mm, offset, fp, tokens - 1.0, now)
+                    return False
+                self.SLOT.pack_into(mm, offset, fp, tokens, now)
+                return True
+            if fp == 0:
+                # Keys are never removed, only replaced, so the first empty slot ends the probe
+                victim = offset
+                break
+            if victim_refill > -1.0:
+                if tokens + (now - last_refill) / self.refill_interval >= self.capacity:
+                    victim, victim_refill = offset, -1.0  # idle: equivalent to a fresh bucket
+                elif last_refill < victim_refill:
+                    victim, victim_refill = offset, last_refill
+        self.SLOT.pack_into(mm, victim, fingerprint, float(self.capacity) - 1.0, now)
+        return False
+
+    def close(self) -> None:
+        self._mm.close()
+        os.close(self._fd)
+
+
 # Global rate limiter instance
-_rate_limiter: TokenBucket | None = None
+_rate_limiter: TokenBucket | SharedMemoryTokenBucket | None = None
 
 
-def get_rate_limiter() -> TokenBucket:
-    """Get or create the global rate limiter."""
+def get_rate_limiter() -> TokenBucket | SharedMemoryTokenBucket:
+    """Get or create the global rate limiter (rate_limit_backend: memory or shm)."""
     global _rate_limiter
     if _rate_limiter is None:
-        _rate_limiter = TokenBucket()
+        if settings.rate_limit_backend == "shm":
+            _rate_limiter = SharedMemoryTokenBucket()
+        else:
+            _rate_limiter = TokenBucket()
     return _rate_limiter
@@ -1,7 +1,8 @@
 """Repository layer for database operations."""
 import uuid
 import logging
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -16,16 +17,28 @@ async def create_content(
     user_id: str,
     text: str,
     content_id: Optional[uuid.UUID] = None,
+    status: str = "PENDING",
+    tenant_id: Optional[str] = None,
+    lane: Optional[str] = None,
 ) -> Content:
-    """Create a new content record and initial moderation result."""
+    """
+    Create a new content record and initial moderation result.
+
+    status is PENDING unless the content was already moderated inline.
+    """
     content = Content(
         id=content_id or uuid.uuid4(),
         user_id=user_id,
         text=text,
+        tenant_id=tenant_id,
+        lane=lane,
     )
     session.add(content)
-    # Create pending moderation result
-    result = ModerationResult(content_id=content.id, status="PENDING")
+    result = ModerationResult(
+        content_id=content.id,
+        status=status,
+        moderated_at=None if status == "PENDING" else datetime.now(timezone.utc),
+    )
     session.add(result)
     await session.flush()
     logger.info("Created content id=%s for user_id=%s", content.id, user_id)
@@ -45,6 +58,24 @@ async def get_content_status(
     return row
 
 
+async def get_content_statuses(
+    session: AsyncSession,
+    content_ids: Iterable[uuid.UUID],
+) -> Dict[uuid.UUID, str]:
+    """
+    Get moderation status for many content ids in one query.
+
+    Content without a moderation result is PENDING; unknown ids are omitted.
+    """
+    stmt = (
+        select(Content.id, ModerationResult.status)
+        .outerjoin(ModerationResult, ModerationResult.content_id == Content.id)
+        .where(Content.id.in_(list(content_ids)))
+    )
+    result = await session.execute(stmt)
+    return {content_id: status or "PENDING" for content_id, status in result.all()}
+
+
 async def content_exists(session: AsyncSession, content_id: uuid.UUID) -> bool:
     """Check if content exists."""
     stmt = select(Content.id).where(Content.id == content_id)
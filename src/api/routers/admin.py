@@ -0,0 +1,40 @@
+"""Admin-only diagnostics endpoints."""
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from src.common.config import settings
+from src.common.instrumentation import ProfilerBusyError, format_collapsed, get_profiler
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+async def verify_admin_key(x_admin_key: str | None = Header(None)) -> None:
+    """Admin endpoints do not exist unless ADMIN_API_KEY is set."""
+    if not settings.admin_api_key:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(x_admin_key or "", settings.admin_api_key):
+        raise HTTPException(status_code=401, detail="Invalid or missing admin key")
+
+
+@router.post(
+    "/profile",
+    response_class=PlainTextResponse,
+    summary="Sample this worker's event loop and return collapsed stacks",
+    dependencies=[Depends(verify_admin_key)],
+)
+async def profile(
+    seconds: float = Query(10.0, gt=0, le=settings.profiler_max_seconds),
+) -> PlainTextResponse:
+    """
+    Profile the event loop of the worker process serving this request.
+
+    Returns collapsed stacks ("frame;frame;... count" per line), ready for
+    flamegraph.pl or speedscope.
+    """
+    try:
+        stacks = await get_profiler().profile(seconds)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(format_collapsed(stacks))
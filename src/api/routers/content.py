@@ -2,19 +2,33 @@
 import logging
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Request, Header
+from fastapi import APIRouter, Depends, HTTPException, Request, Header, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.api.message_queue import publish_content_submitted
+from src.api.coalescing import get_single_flight
+from src.api.idempotency import (
+    IdempotencyClaim,
+    IdempotencyInProgress,
+    IdempotencyKeyReused,
+    claim_idempotency_key,
+    get_idempotency_store,
+    request_fingerprint,
+)
+from src.api.message_queue import publish_content_submitted, publish_inline_verdict
 from src.api.rate_limiter import get_rate_limiter
-from src.api.repositories import create_content, get_content_status, content_exists
+from src.api.repositories import create_content, get_content_statuses
 from src.api.schemas import (
     ContentSubmitRequest,
     ContentSubmitResponse,
     ContentStatusResponse,
+    ContentStatusBatchRequest,
+    ContentStatusBatchResponse,
 )
 from src.common.config import settings
-from src.common.database import async_session_maker
+from src.common.circuit_breaker import CircuitOpenError
+from src.common.database import LazySession, async_session_maker, db_circuit_breaker
+from src.common.lanes import resolve_lane
+from src.processor.moderation import moderate_inline
 
 logger = logging.getLogger(__name__)
 
@@ -22,60 +36,227 @@ router = APIRouter(prefix="/api/v1/content", tags=["content"])
 
 
 async def get_db() -> AsyncSession:
-    """Dependency to get database session."""
-    async with async_session_maker() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
+    """
+    Dependency to get a database session, opened lazily on first use.
 
+    The session goes through the database circuit breaker; if it was used,
+    the request's outcome is recorded on the breaker.
+    """
+    session = LazySession(breaker=db_circuit_breaker)
+    try:
+        yield session
+        await session.commit()
+    except Exception as e:
+        if session.opened:
+            db_circuit_breaker.record_outcome(e)
+        await session.rollback()
+        raise
+    else:
+        if session.opened:
+            db_circuit_breaker.record_success()
+    finally:
+        await session.close()
+
+
+async def verify_api_key(x_api_key: str | None = Header(None)) -> str | None:
+    """
+    Optional API key verification.
 
-async def verify_api_key(x_api_key: str | None = Header(None)) -> None:
-    """Optional API key verification."""
+    Returns:
+        The tenant of a key listed in api_key_tenants, None otherwise.
+    """
+    tenant = settings.api_key_tenants.get(x_api_key or "")
+    if tenant is not None:
+        return tenant
     if settings.api_key and settings.api_key != x_api_key:
         raise HTTPException(status_code=401, detail="Invalid or missing API key")
+    return None
+
+
+async def resolve_tenant(
+    body: ContentSubmitRequest,
+    key_tenant: str | None = Depends(verify_api_key),
+) -> str | None:
+    """
+    The submission's tenant, taken from the caller's API key.
+
+    tenantId may be omitted or repeat the key's tenant; any other tenantId,
+    or one sent without a tenant key, is rejected so a caller cannot push
+    verdicts to another tenant's webhooks.
+    """
+    if body.tenantId is not None and body.tenantId != key_tenant:
+        raise HTTPException(status_code=403, detail="tenantId does not match the API key")
+    return key_tenant
+
+
+async def resolve_user_tier(
+    x_api_key: str | None = Header(None),
+    key_tenant: str | None = Depends(verify_api_key),
+) -> str | None:
+    """
+    The caller's user tier, from its (already verified) API key.
+
+    Never taken from the request itself, so a caller cannot pick a faster lane.
+    """
+    return settings.api_key_tiers.get(x_api_key or "")
+
+
+async def idempotency(
+    body: ContentSubmitRequest,
+    idempotency_key: str | None = Header(None, max_length=255),
+    tenant: str | None = Depends(resolve_tenant),
+) -> IdempotencyClaim | None:
+    """
+    Idempotency-Key handling, applied before rate limiting so replays cost no token.
+
+    Keys are scoped per tenant and userId. A repeat of a completed request is answered
+    with the stored response (IdempotentReplay); a concurrent duplicate waits
+    for the first request. The response the handler leaves on the claim is
+    stored after get_db has committed (this dependency is entered first, so
+    it exits last). If the request fails, including the commit, the key is
+    released so the client's retry runs.
+    """
+    if idempotency_key is None:
+        yield None
+        return
+    scope = f"{tenant}:{body.userId}" if tenant is not None else body.userId
+    try:
+        claim = await claim_idempotency_key(
+            get_idempotency_store(), f"{scope}:{idempotency_key}", request_fingerprint(body)
+        )
+    except IdempotencyInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if claim is None:
+        yield None
+        return
+    try:
+        yield claim
+    except Exception:
+        await claim.release()
+        raise
+    if claim.response is not None:
+        await claim.complete(*claim.response)
+    else:
+        await claim.release()
+
+
+async def enforce_rate_limit(body: ContentSubmitRequest) -> None:
+    """Per-userId rate limiting, applied before any handler work."""
+    if get_rate_limiter().check_and_apply_rate_limit(body.userId):
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded. Too many requests.",
+        )
+
+
+async def _forward_inline_verdict(
+    content_id: uuid.UUID, user_id: str, status: str, tenant_id: str, lane: str
+) -> None:
+    """Hand an inline verdict to the processor for webhook delivery (best effort)."""
+    try:
+        await publish_inline_verdict(content_id, user_id, status, tenant_id, lane)
+    except Exception as e:
+        logger.warning("Failed to forward inline verdict for content_id=%s: %s", content_id, e)
 
 
 @router.post(
     "/submit",
     response_model=ContentSubmitResponse,
+    response_model_exclude_none=True,
     status_code=202,
     summary="Submit content for moderation",
+    # Resolved in order before the handler's own dependencies, so 401/403/429
+    # rejections and idempotent replays never reach get_db
+    dependencies=[
+        Depends(verify_api_key),
+        Depends(resolve_tenant),
+        Depends(idempotency),
+        Depends(enforce_rate_limit),
+    ],
 )
 async def submit_content(
     body: ContentSubmitRequest,
     request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    _: None = Depends(verify_api_key),
+    user_tier: str | None = Depends(resolve_user_tier),
+    tenant_id: str | None = Depends(resolve_tenant),
+    claim: IdempotencyClaim | None = Depends(idempotency),
 ) -> ContentSubmitResponse:
     """
     Submit content for moderation.
 
-    - Applies rate limiting per userId (configurable tokens per minute).
-    - Returns 202 Accepted with contentId if accepted.
+    - Applies API key check, then rate limiting per userId (configurable
+      tokens per minute), before a database session is acquired.
+    - Routes to the priority lane of the API key's user tier; `priority`
+      can only lower it.
+    - Tags the content with the tenant of the caller's API key; returns 403
+      if tenantId names another tenant.
+    - Returns 202 Accepted with contentId if queued.
+    - Returns 200 OK with contentId and status if moderated inline
+      (inline_moderation_enabled and text within inline_moderation_max_chars).
+      A tenant's inline verdict is committed, then forwarded to the processor
+      for webhook delivery.
     - Returns 429 Too Many Requests if rate-limited.
+    - With an Idempotency-Key header, repeats of a completed request get the
+      original response without creating or publishing anything.
     """
-    rate_limiter = get_rate_limiter()
-    if rate_limiter.check_and_apply_rate_limit(body.userId):
-        raise HTTPException(
-            status_code=429,
-            detail="Rate limit exceeded. Too many requests.",
-        )
+    verdict = None
+    if settings.inline_moderation_enabled:
+        verdict = moderate_inline(body.text, settings.inline_moderation_max_chars)
 
-    content = await create_content(db, body.userId, body.text)
+    lane = resolve_lane(body.priority, user_tier)
+    content = await create_content(
+        db, body.userId, body.text, status=verdict or "PENDING", tenant_id=tenant_id, lane=lane
+    )
 
-    try:
-        await publish_content_submitted(content.id, body.text, body.userId)
-    except Exception as e:
-        logger.exception("Failed to publish event, content saved: %s", e)
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to queue content for moderation.",
+    if verdict is not None:
+        response.status_code = 200
+        result = ContentSubmitResponse(contentId=content.id, status=verdict)
+        if tenant_id is not None:
+            # Commit first so a webhook never reports content that was rolled back
+            await db.commit()
+            await _forward_inline_verdict(content.id, body.userId, verdict, tenant_id, lane)
+    else:
+        result = ContentSubmitResponse(contentId=content.id)
+        try:
+            await publish_content_submitted(
+                content.id, body.text, body.userId, lane, tenant_id=tenant_id
+            )
+        except Exception as e:
+            if not settings.publish_outbox_fallback:
+                if isinstance(e, CircuitOpenError):
+                    raise
+                logger.exception("Failed to publish event, content saved: %s", e)
+                raise HTTPException(
+                    status_code=500,
+                    detail="Failed to queue content for moderation.",
+                )
+            # Content is saved as PENDING; the processor's sweeper will requeue it
+            logger.warning("Publish failed, leaving content_id=%s for the sweeper: %s", content.id, e)
+
+    if claim is not None:
+        claim.response = (
+            response.status_code or 202,
+            result.model_dump(mode="json", exclude_none=True),
         )
+    return result
 
-    return ContentSubmitResponse(contentId=content.id)
+
+async def _fetch_statuses(content_ids: list[uuid.UUID]) -> dict[uuid.UUID, str]:
+    """Load statuses in a session of their own, so coalesced callers can share the result."""
+
+    async def query() -> dict[uuid.UUID, str]:
+        async with async_session_maker() as session:
+            return await get_content_statuses(session, content_ids)
+
+    return await db_circuit_breaker.call(query)
+
+
+async def _fetch_status(content_id: uuid.UUID) -> str | None:
+    return (await _fetch_statuses([content_id])).get(content_id)
 
 
 @router.get(
@@ -83,22 +264,41 @@ async def submit_content(
     response_model=ContentStatusResponse,
     summary="Get moderation status",
 )
-async def get_status(
-    content_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db),
-) -> ContentStatusResponse:
+async def get_status(content_id: uuid.UUID) -> ContentStatusResponse:
     """
     Get the moderation status of content.
 
     Returns 200 with status (PENDING, APPROVED, REJECTED).
     Returns 404 if contentId does not exist.
+    Concurrent lookups of the same contentId share one database query.
     """
-    exists = await content_exists(db, content_id)
-    if not exists:
-        raise HTTPException(status_code=404, detail="Content not found")
-
-    status = await get_content_status(db, content_id)
+    status = await get_single_flight("content_status").do(
+        content_id, lambda: _fetch_status(content_id)
+    )
     if status is None:
-        status = "PENDING"
+        raise HTTPException(status_code=404, detail="Content not found")
 
     return ContentStatusResponse(contentId=content_id, status=status)
+
+
+@router.post(
+    "/status/batch",
+    response_model=ContentStatusBatchResponse,
+    summary="Get moderation status of many contents",
+)
+async def get_status_batch(body: ContentStatusBatchRequest) -> ContentStatusBatchResponse:
+    """
+    Get the moderation status of up to 100 contents in one call.
+
+    Ids already being looked up by concurrent requests join those lookups;
+    the rest are loaded with a single query. Unknown ids are listed in notFound.
+    """
+    statuses = await get_single_flight("content_status").do_many(body.contentIds, _fetch_statuses)
+    return ContentStatusBatchResponse(
+        results=[
+            ContentStatusResponse(contentId=content_id, status=status)
+            for content_id, status in statuses.items()
+            if status is not None
+        ],
+        notFound=[content_id for content_id, status in statuses.items() if status is None],
+    )
@@ -1,7 +1,9 @@
 """Pydantic schemas for request/response validation."""
 import uuid
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from src.common.config import settings
 
 
 class ContentSubmitRequest(BaseModel):
@@ -9,14 +11,34 @@ class ContentSubmitRequest(BaseModel):
 
     text: str = Field(..., min_length=1, description="Content text to moderate")
     userId: str = Field(..., min_length=1, description="User identifier")
+    priority: str | None = Field(
+        None,
+        description="Priority lane (e.g. high, normal, low); can only lower the user tier's lane",
+    )
+    tenantId: str | None = Field(
+        None,
+        min_length=1,
+        max_length=255,
+        description="Tenant whose webhooks receive the verdict; must match the API key's tenant",
+    )
 
     model_config = {"json_schema_extra": {"example": {"text": "Hello world", "userId": "user123"}}}
 
+    @field_validator("priority")
+    @classmethod
+    def validate_priority(cls, v: str | None) -> str | None:
+        if v is not None and v not in settings.priority_lane_weights:
+            raise ValueError(f"priority must be one of {sorted(settings.priority_lane_weights)}")
+        return v
+
 
 class ContentSubmitResponse(BaseModel):
     """Response for content submission."""
 
     contentId: uuid.UUID = Field(..., description="Unique content identifier")
+    status: str | None = Field(
+        None, description="APPROVED or REJECTED when moderated inline (200); omitted when queued (202)"
+    )
 
     model_config = {"json_schema_extra": {"example": {"contentId": "550e8400-e29b-41d4-a716-446655440000"}}}
 
@@ -34,6 +56,21 @@ class ContentStatusResponse(BaseModel):
     }
 
 
+class ContentStatusBatchRequest(BaseModel):
+    """Request body for bulk status retrieval."""
+
+    contentIds: list[uuid.UUID] = Field(
+        ..., min_length=1, max_length=100, description="Content identifiers (max 100)"
+    )
+
+
+class ContentStatusBatchResponse(BaseModel):
+    """Response for bulk status retrieval."""
+
+    results: list[ContentStatusResponse] = Field(..., description="Statuses of known content")
+    notFound: list[uuid.UUID] = Field(default_factory=list, description="Unknown content ids")
+
+
 class ErrorResponse(BaseModel):
     """Error response body."""
 
@@ -0,0 +1,108 @@
+"""Circuit breaker for calls to Redis and Postgres."""
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from src.common.config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} unavailable (circuit open)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    - closed: calls pass; failure_threshold consecutive failures open the circuit.
+    - open: calls fail fast with CircuitOpenError for reset_timeout seconds.
+    - half_open: one probe call is let through; success closes the circuit,
+      failure re-opens it.
+
+    Only exceptions of failure_types count as failures; anything else means
+    the dependency answered. Background health probes report through
+    record_success/record_failure, so recovery is detected even when no
+    traffic is let through.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int | None = None,
+        reset_timeout: float | None = None,
+        failure_types: tuple[type[BaseException], ...] = (Exception,),
+    ):
+        self.name = name
+        self.failure_types = failure_types
+        self.failure_threshold = failure_threshold or settings.circuit_breaker_failure_threshold
+        self.reset_timeout = (
+            reset_timeout if reset_timeout is not None else settings.circuit_breaker_reset_timeout_seconds
+        )
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def before_call(self) -> None:
+        """Admit a call or raise CircuitOpenError. Admitted calls must record an outcome."""
+        if self.state == CLOSED:
+            return
+        remaining = self.opened_at + self.reset_timeout - time.monotonic()
+        if self.state == OPEN and remaining <= 0:
+            self.state = HALF_OPEN
+            logger.info("Circuit %s half-open, probing", self.name)
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        raise CircuitOpenError(self.name, max(remaining, 0.0))
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            logger.info("Circuit %s closed", self.name)
+        self.state = CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == HALF_OPEN or (
+            self.state == CLOSED and self.failures >= self.failure_threshold
+        ):
+            logger.warning("Circuit %s opened after %d failures", self.name, self.failures)
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+        elif self.state == OPEN:
+            self.opened_at = time.monotonic()
+
+    def record_outcome(self, error: BaseException | None) -> None:
+        """Record the outcome of an admitted call from the exception it raised, if any."""
+        if error is not None and isinstance(error, self.failure_types):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """Run fn through the breaker."""
+        self.before_call()
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception as e:
+            self.record_outcome(e)
+            raise
+        self.record_success()
+        return result
+
+    def snapshot(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures}
@@ -16,12 +16,133 @@ class Settings(BaseSettings):
     # Rate Limiting (Token Bucket) - API only
     rate_limit_tokens_per_minute: int = 5
     rate_limit_bucket_capacity: int = 5
+    # "memory" (per process) or "shm" (shared by all workers on the host)
+    rate_limit_backend: str = "memory"
+    rate_limit_shm_path: str = "/dev/shm/content-moderation-rate-limit"
+    rate_limit_shm_slots: int = 65536
 
-    # Message queue channel
+    # Idempotency-Key on submit - API only. "redis" (shared by all API
+    # instances) or "memory" (per process, for single-process deployments)
+    idempotency_backend: str = "redis"
+    # How long a completed response is replayed for a repeated key
+    idempotency_ttl_seconds: float = 86400.0
+    # How long an in-progress claim survives a crashed request
+    idempotency_lock_ttl_seconds: float = 30.0
+    # How long a concurrent duplicate waits for the first request before 409
+    idempotency_wait_timeout_seconds: float = 10.0
+
+    # Message queue - key prefix of the per-lane Redis streams
     moderation_events_channel: str = "content-moderation-events"
+    # Approximate cap on entries kept per lane stream (XADD MAXLEN ~)
+    lane_stream_max_length: int = 1000000
+
+    # Priority lanes - each lane is published to the stream "<channel>:<lane>"
+    # and consumed with weighted fair scheduling (weight = share of dispatches)
+    priority_lane_weights: dict[str, int] = {"high": 5, "normal": 3, "low": 1}
+    default_priority_lane: str = "normal"
+    # User tier (from the caller's API key, api_key_tiers) -> priority lane
+    user_tier_lanes: dict[str, str] = {"premium": "high", "bulk": "low"}
+    lane_metrics_log_interval_seconds: float = 60.0
+    # Events buffered per lane in each processor; a full lane is not read
+    # from its stream until it has room again. Keep it to a few reads
+    # (stream_read_count): buffered entries are pending, and ones still
+    # buffered after stream_claim_idle_seconds are claimed by another worker
+    lane_max_buffered_events: int = 300
+
+    # Lane stream consumer group - Processor only. Every worker is one
+    # consumer, so each entry is delivered to one worker and stays pending
+    # until acked
+    processor_consumer_group: str = "moderation-processors"
+    stream_read_count: int = 100
+    stream_read_block_seconds: float = 1.0
+    # Entries pending this long (crashed or stopped worker) are claimed by
+    # another worker
+    stream_claim_idle_seconds: float = 60.0
+    stream_claim_interval_seconds: float = 15.0
+
+    # Retry / dead-letter queue - Processor only
+    retry_queue_key: str = "moderation:retry"
+    dead_letter_queue_key: str = "moderation:dead-letter"
+    retry_max_attempts: int = 5
+    retry_backoff_base_seconds: float = 1.0
+    retry_backoff_max_seconds: float = 300.0
+    retry_poll_interval_seconds: float = 1.0
+    retry_batch_size: int = 100
+
+    # PENDING reconciliation sweeper - Processor only
+    sweeper_enabled: bool = True
+    sweeper_interval_seconds: float = 60.0
+    sweeper_min_age_seconds: float = 300.0
+    sweeper_batch_size: int = 500
+    sweeper_max_requeue_per_second: float = 200.0
+
+    # Verdict webhooks - processor only. Tenant -> endpoint URLs (JSON); verdicts
+    # are POSTed in batches of {"verdicts": [...]} per endpoint
+    webhook_subscriptions: dict[str, list[str]] = {}
+    webhook_batch_size: int = 100
+    # How long an endpoint waits for more verdicts before sending a partial batch
+    webhook_linger_seconds: float = 0.5
+    webhook_max_concurrency_per_endpoint: int = 2
+    # Verdicts buffered per endpoint; beyond this new verdicts are dropped
+    webhook_queue_size: int = 10000
+    webhook_timeout_seconds: float = 5.0
+    webhook_max_attempts: int = 5
+    webhook_backoff_base_seconds: float = 0.5
+    webhook_backoff_max_seconds: float = 30.0
+    webhook_max_connections: int = 100
+
+    # Processor supervisor - worker count defaults to the CPU count
+    processor_workers: int | None = None
+    processor_drain_timeout_seconds: float = 30.0
+    processor_restart_backoff_max_seconds: float = 30.0
+    processor_health_interval_seconds: float = 15.0
+    # Optional JSON file the supervisor writes aggregated worker health to
+    processor_health_file: str | None = None
+
+    # Moderation engine: "mock" (keyword + random) or "ngram" (hashed n-gram linear model)
+    moderation_engine: str = "mock"
+    # Model file for the ngram engine (memory-mapped); unset = keyword bootstrap model
+    moderation_model_path: str | None = None
+    # Events scored together per micro-batch in the processor
+    moderation_batch_size: int = 32
+
+    # Inline moderation fast path - API only. Texts up to the size limit are
+    # moderated in the request and returned with 200 instead of being queued.
+    inline_moderation_enabled: bool = False
+    inline_moderation_max_chars: int = 280
+    # ngram engine: scores within this distance of the threshold are queued instead
+    inline_moderation_ambiguity_margin: float = 0.1
+
+    # Circuit breakers and background health monitor - API only
+    circuit_breaker_failure_threshold: int = 5
+    circuit_breaker_reset_timeout_seconds: float = 10.0
+    health_check_interval_seconds: float = 5.0
+    health_check_timeout_seconds: float = 2.0
+    redis_socket_timeout_seconds: float = 2.0
+    # Accept submissions when publishing fails and leave them PENDING for the
+    # processor's sweeper to requeue (the content table acts as the outbox)
+    publish_outbox_fallback: bool = False
+
+    # Event-loop instrumentation - API and processor
+    loop_lag_sample_interval_seconds: float = 0.1
+    # The watchdog logs the loop thread's stack when the loop is blocked this long
+    loop_block_threshold_seconds: float = 0.25
+    profiler_sample_interval_seconds: float = 0.005
+    profiler_max_seconds: float = 60.0
+    # Processor: SIGUSR1 writes a profile of this length to profile_output_dir
+    profile_signal_seconds: float = 10.0
+    profile_output_dir: str = "/tmp"
 
     # Optional API key - API only
     api_key: str | None = None
+    # Per-tenant API keys (key -> tenant); a submission's tenantId must match
+    # its key's tenant, which is also the default - API only
+    api_key_tenants: dict[str, str] = {}
+    # User tier of an accepted API key (api_key or a tenant key), which picks
+    # the priority lane through user_tier_lanes - API only
+    api_key_tiers: dict[str, str] = {}
+    # Admin endpoints (/admin/*) are disabled unless set - API only
+    admin_api_key: str | None = None
 
     # API service
     api_host: str = "0.0.0.0"
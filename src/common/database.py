@@ -1,11 +1,13 @@
 """Database connection - shared between API and Processor."""
+import asyncio
 import logging
 from typing import AsyncGenerator
 
-from sqlalchemy import text
+from sqlalchemy import exc, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
+from src.common.circuit_breaker import CircuitBreaker
 from src.common.config import settings
 
 logger = logging.getLogger(__name__)
@@ -33,6 +35,55 @@ async_session_maker = async_sessionmaker(
     autoflush=False,
 )
 
+# Errors meaning the database is unreachable (as opposed to a bad query)
+DB_UNAVAILABLE_ERRORS = (OSError, asyncio.TimeoutError, exc.OperationalError, exc.InterfaceError)
+
+db_circuit_breaker = CircuitBreaker("database", failure_types=DB_UNAVAILABLE_ERRORS)
+
+
+class LazySession:
+    """
+    AsyncSession proxy that only creates the session on first use.
+
+    commit/rollback/close are no-ops if the session was never used, so
+    requests rejected before touching the database cost no session.
+    With a breaker, first use fails fast with CircuitOpenError while the
+    circuit is open; the caller records the outcome.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker | None = None,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self._session_maker = session_maker
+        self._breaker = breaker
+        self._session: AsyncSession | None = None
+
+    @property
+    def opened(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name: str):
+        if self._session is None:
+            if self._breaker is not None:
+                self._breaker.before_call()
+            self._session = (self._session_maker or async_session_maker)()
+        return getattr(self._session, name)
+
+    async def commit(self) -> None:
+        if self._session is not None:
+            await self._session.commit()
+
+    async def rollback(self) -> None:
+        if self._session is not None:
+            await self._session.rollback()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
     """Get a database session."""
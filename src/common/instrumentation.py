@@ -0,0 +1,253 @@
+"""
+Event-loop instrumentation shared by the API and the processor.
+
+- LoopLagMonitor: measures event-loop lag continuously into a histogram, and
+  a watchdog thread logs the loop thread's stack while the loop is blocked.
+- SamplingProfiler: on-demand, time-boxed stack sampler producing collapsed
+  stacks (flamegraph.pl / speedscope input). Nothing runs while it is idle.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+
+from src.common.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the loop lag histogram buckets
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class LoopLagMonitor:
+    """
+    Event-loop lag histogram plus a blocked-loop watchdog.
+
+    A task sleeps for interval and records how late it wakes up; that delay is
+    time the loop spent running other callbacks. The task also stamps each
+    wake-up, so a watchdog thread can tell when the loop has not come back for
+    longer than block_threshold and log the stack the loop thread is stuck in
+    (once per stall).
+    """
+
+    def __init__(self, interval: float | None = None, block_threshold: float | None = None):
+        self.interval = interval or settings.loop_lag_sample_interval_seconds
+        self.block_threshold = block_threshold or settings.loop_block_threshold_seconds
+        self.samples = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.blocked = 0
+        self._histogram = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self._last_tick = 0.0
+        self._reported_tick: float | None = None
+        self._loop_thread_id: int | None = None
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def record(self, lag: float) -> None:
+        lag_ms = lag * 1000
+        self.samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        bucket = next((i for i, b in enumerate(LAG_BUCKETS_MS) if lag_ms <= b), len(LAG_BUCKETS_MS))
+        self._histogram[bucket] += 1
+
+    async def _measure(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_tick = now
+            self.record(max(0.0, now - expected))
+
+    def check_blocked(self) -> bool:
+        """Log the loop thread's stack if the loop is stalled (watchdog thread)."""
+        tick = self._last_tick
+        stalled = time.monotonic() - tick - self.interval
+        if stalled < self.block_threshold or tick == self._reported_tick:
+            return False
+        self._reported_tick = tick
+        self.blocked += 1
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else "<unavailable>\n"
+        logger.warning(
+            "Event loop blocked for %.0fms, loop thread stack:\n%s", stalled * 1000, stack
+        )
+        return True
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.block_threshold / 2):
+            self.check_blocked()
+
+    def start(self) -> None:
+        """Start measuring the running loop (call from the loop's thread)."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._measure())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join()
+            self._watchdog = None
+
+    def percentile(self, q: float) -> float | None:
+        """Upper bound (ms) of the histogram bucket holding quantile q; None above the last bucket."""
+        if not self.samples:
+            return 0.0
+        rank = q * self.samples
+        seen = 0
+        for bound, count in zip(LAG_BUCKETS_MS, self._histogram):
+            seen += count
+            if seen >= rank:
+                return float(bound)
+        return None
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{b}ms" for b in LAG_BUCKETS_MS] + [f"gt_{LAG_BUCKETS_MS[-1]}ms"]
+        return {
+            "samples": self.samples,
+            "mean_ms": round(self.total_lag / self.samples * 1000, 2) if self.samples else 0.0,
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_lag * 1000, 2),
+            "blocked": self.blocked,
+            "histogram": dict(zip(labels, self._histogram)),
+        }
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", os.path.basename(code.co_filename))
+    return f"{code.co_qualname} ({module}:{frame.f_lineno})".replace(";", ":")
+
+
+def _collapse(frame, thread_name: str) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+
+def format_collapsed(stacks: Counter) -> str:
+    """Collapsed-stack text: one "root;...;leaf count" line per distinct stack."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+class SamplingProfiler:
+    """
+    Time-boxed stack sampler.
+
+    run() samples sys._current_frames() every interval from its own thread.
+    No tracing hook or thread exists outside a run, so an idle profiler
+    costs nothing. One run at a time per process.
+    """
+
+    def __init__(self, interval: float | None = None):
+        self.interval = interval or settings.profiler_sample_interval_seconds
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def run(self, seconds: float, thread_ids: set[int] | None = None) -> Counter:
+        """
+        Sample stacks for seconds (blocking).
+
+        Args:
+            thread_ids: Threads to sample; all other threads if None.
+
+        Returns:
+            Collapsed stack -> sample count.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            me = threading.get_ident()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            stacks: Counter = Counter()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                for ident, frame in sys._current_frames().items():
+                    if ident == me or (thread_ids is not None and ident not in thread_ids):
+                        continue
+                    stacks[_collapse(frame, names.get(ident, f"thread-{ident}"))] += 1
+                time.sleep(self.interval)
+            return stacks
+        finally:
+            self._lock.release()
+
+    async def profile(self, seconds: float) -> Counter:
+        """Profile the calling event loop's thread from a worker thread."""
+        loop_thread = threading.get_ident()
+        return await asyncio.to_thread(self.run, seconds, {loop_thread})
+
+
+async def dump_profile(seconds: float | None = None, directory: str | None = None) -> str | None:
+    """Profile the running loop and write collapsed stacks to a file; returns its path."""
+    seconds = seconds or settings.profile_signal_seconds
+    directory = directory or settings.profile_output_dir
+    try:
+        stacks = await get_profiler().profile(seconds)
+        path = os.path.join(directory, f"profile-{os.getpid()}-{int(time.time())}.collapsed")
+        with open(path, "w") as f:
+            f.write(format_collapsed(stacks))
+    except Exception as e:
+        logger.error("Profile failed: %s", e)
+        return None
+    logger.info("Wrote %.0fs profile (%d samples) to %s", seconds, sum(stacks.values()), path)
+    return path
+
+
+_background: set[asyncio.Task] = set()
+
+
+def schedule_profile_dump() -> None:
+    """Signal handler (loop.add_signal_handler): write a profile in the background."""
+    task = asyncio.get_running_loop().create_task(dump_profile())
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+# Process-wide instances
+_loop_monitor: LoopLagMonitor | None = None
+_profiler: SamplingProfiler | None = None
+
+
+def get_loop_monitor() -> LoopLagMonitor:
+    """Get or create the process-wide loop lag monitor."""
+    global _loop_monitor
+    if _loop_monitor is None:
+        _loop_monitor = LoopLagMonitor()
+    return _loop_monitor
+
+
+def get_profiler() -> SamplingProfiler:
+    """Get or create the process-wide sampling profiler."""
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler()
+    return _profiler
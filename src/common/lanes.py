@@ -0,0 +1,24 @@
+"""Priority lanes - shared between API (publish) and Processor (consume)."""
+from src.common.config import settings
+
+
+def stream_for_lane(lane: str) -> str:
+    """Redis stream a lane is published to."""
+    return f"{settings.moderation_events_channel}:{lane}"
+
+
+def resolve_lane(priority: str | None = None, user_tier: str | None = None) -> str:
+    """
+    Pick the lane for a submission.
+
+    The lane mapped to the user tier, else the default lane. An explicit
+    priority can only lower it (to a lane of no greater weight), so a caller
+    cannot move its own traffic ahead of its tier. Unknown values are ignored.
+    """
+    lanes = settings.priority_lane_weights
+    lane = settings.user_tier_lanes.get(user_tier or "")
+    if lane not in lanes:
+        lane = settings.default_priority_lane
+    if priority in lanes and lanes[priority] <= lanes.get(lane, 0):
+        return priority
+    return lane
@@ -3,7 +3,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, ForeignKey, Text, VARCHAR
+from sqlalchemy import DateTime, ForeignKey, Index, Text, VARCHAR, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -20,6 +20,8 @@ class Content(Base):
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     user_id: Mapped[str] = mapped_column(VARCHAR(255), nullable=False, index=True)
+    tenant_id: Mapped[Optional[str]] = mapped_column(VARCHAR(255), nullable=True)
+    lane: Mapped[Optional[str]] = mapped_column(VARCHAR(50), nullable=True)
     text: Mapped[str] = mapped_column(Text, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
@@ -34,6 +36,14 @@ class ModerationResult(Base):
     """Moderation result model."""
 
     __tablename__ = "moderation_results"
+    __table_args__ = (
+        # Partial index: only PENDING rows, so the sweeper scans the backlog, not the table
+        Index(
+            "idx_moderation_results_pending",
+            "content_id",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+    )
 
     content_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -1,27 +1,44 @@
-"""Redis Pub/Sub consumer for ContentSubmitted events."""
+"""Redis Streams consumer for ContentSubmitted events."""
 import asyncio
 import json
 import logging
+import socket
 import uuid
 from datetime import datetime, timezone
 
 import redis.asyncio as redis
+from redis.exceptions import RedisError
 from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.common.config import settings
 from src.common.database import async_session_maker
+from src.common.instrumentation import get_loop_monitor
 from src.common.models import ModerationResult
-from src.processor.moderation import moderate_content
+from src.processor.moderation import load_engine, moderate_batch
+from src.processor.retry import RetryQueue
+from src.processor.scheduler import WeightedFairScheduler
+from src.processor.streams import LaneStreams, StreamEntry
+from src.processor.sweeper import run_sweeper
+from src.processor.webhooks import WebhookDispatcher
 
 logger = logging.getLogger(__name__)
 
 
-async def process_message(payload: dict) -> None:
+async def process_message(payload: dict, status: str | None = None) -> str | None:
     """
     Process a ContentSubmitted event.
 
-    Payload: {"contentId": "<UUID>", "text": "<content_text>", "userId": "<user_id>"}
+    Payload: {"contentId": "<UUID>", "text": "<content_text>", "userId": "<user_id>",
+              "tenantId": "<tenant_id>" (optional)}
+
+    status is the verdict if already computed as part of a batch.
+
+    The update only applies while the status is still PENDING, so retries and
+    replays of already-moderated content are no-ops.
+
+    Returns:
+        The verdict if it was written, None otherwise.
     """
     try:
         content_id_str = payload.get("contentId")
@@ -30,20 +47,24 @@ async def process_message(payload: dict) -> None:
 
         if not content_id_str:
             logger.error("Invalid payload: missing contentId")
-            return
+            return None
 
         content_id = uuid.UUID(content_id_str)
     except (ValueError, TypeError) as e:
         logger.error("Invalid payload: %s", e)
-        return
+        return None
 
-    status = moderate_content(text)
+    if status is None:
+        status = moderate_batch([text])[0]
 
     async with async_session_maker() as session:
         try:
             stmt = (
                 update(ModerationResult)
-                .where(ModerationResult.content_id == content_id)
+                .where(
+                    ModerationResult.content_id == content_id,
+                    ModerationResult.status == "PENDING",
+                )
                 .values(
                     status=status,
                     moderated_at=datetime.now(timezone.utc),
@@ -53,46 +74,312 @@ async def process_message(payload: dict) -> None:
             await session.commit()
 
             if result.rowcount == 0:
-                logger.warning("No moderation result found for content_id=%s", content_id)
-            else:
                 logger.info(
-                    "Updated moderation result for content_id=%s: status=%s",
+                    "No pending moderation result for content_id=%s (missing or already moderated)",
                     content_id,
-                    status,
                 )
+                return None
+            logger.info(
+                "Updated moderation result for content_id=%s: status=%s",
+                content_id,
+                status,
+            )
+            return status
         except Exception as e:
             logger.exception("Failed to update moderation result: %s", e)
             await session.rollback()
             raise
 
 
-async def run_consumer() -> None:
-    """Subscribe to Redis channel and process events."""
+def _submitted_at(payload: dict) -> float | None:
+    try:
+        return float(payload.get("submittedAt") or 0) or None
+    except (TypeError, ValueError):
+        return None
+
+
+async def _buffer_entries(
+    streams: LaneStreams, scheduler: WeightedFairScheduler, entries: list[StreamEntry]
+) -> None:
+    """Put stream entries on their lanes; unparseable entries are acked and skipped."""
+    for lane, entry_id, payload in entries:
+        if payload is None:
+            await streams.ack(lane, [entry_id])
+        elif not scheduler.put(lane, (payload, entry_id), _submitted_at(payload)):
+            # Left pending; claimed again once idle for stream_claim_idle_seconds
+            logger.warning("Lane %s full, entry %s left pending", lane, entry_id)
+
+
+async def _read_lanes(streams: LaneStreams, scheduler: WeightedFairScheduler) -> None:
+    """
+    Move new stream entries into the scheduler.
+
+    Only lanes with buffer room are read; a full lane's entries wait in its
+    stream, so a backlog never grows the processor's memory.
+    """
+    while True:
+        room = {lane: scheduler.room(lane) for lane in scheduler.lanes}
+        if not any(free is None or free > 0 for free in room.values()):
+            await asyncio.sleep(0.05)
+            continue
+        try:
+            entries = await streams.read(room)
+        except RedisError as e:
+            logger.error("Failed to read lane streams: %s", e)
+            await asyncio.sleep(settings.stream_read_block_seconds)
+            continue
+        await _buffer_entries(streams, scheduler, entries)
+
+
+async def _claim_stale(streams: LaneStreams, scheduler: WeightedFairScheduler) -> None:
+    """Periodically take over entries left pending by crashed or stopped workers."""
+    while True:
+        for lane in scheduler.lanes:
+            free = scheduler.room(lane)
+            limit = settings.stream_read_count if free is None else min(free, settings.stream_read_count)
+            if limit <= 0:
+                continue
+            try:
+                entries = await streams.claim_stale(lane, limit)
+            except RedisError as e:
+                logger.error("Failed to claim stale entries on lane %s: %s", lane, e)
+                continue
+            if entries:
+                logger.info("Claimed %d stale entries on lane %s", len(entries), lane)
+            await _buffer_entries(streams, scheduler, entries)
+        await asyncio.sleep(settings.stream_claim_interval_seconds)
+
+
+def verdict_event(payload: dict, status: str) -> dict:
+    """Webhook representation of a written verdict."""
+    return {
+        "contentId": payload.get("contentId"),
+        "userId": payload.get("userId"),
+        "tenantId": payload.get("tenantId"),
+        "status": status,
+        "moderatedAt": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+async def _dispatch(
+    scheduler: WeightedFairScheduler,
+    idle: asyncio.Event,
+    retry_queue: RetryQueue,
+    webhooks: WebhookDispatcher | None = None,
+    streams: LaneStreams | None = None,
+) -> None:
+    """
+    Process events in weighted fair order across lanes. idle is set between batches.
+
+    Scheduler items are (payload, stream entry id); retries have no entry id.
+    Up to moderation_batch_size ready events are moderated together in one
+    moderate_batch call, then written one by one. Failed events, or the whole
+    batch if moderate_batch raises, are handed to the retry queue instead of
+    being retried inline. An entry is acked once its verdict is written or its
+    retry scheduled; if both fail it stays pending and is claimed again later.
+    Written verdicts, and verdicts the API reached inline ("verdict" in the
+    payload), are queued for webhook delivery (non-blocking).
+    """
+    while True:
+        idle.set()
+        batch = [await scheduler.get()]
+        idle.clear()
+        while len(batch) < settings.moderation_batch_size and scheduler.qsize():
+            batch.append(scheduler.get_nowait())
+
+        done: dict[str, list[str]] = {}
+        events = []
+        for lane, (payload, entry_id) in batch:
+            if "verdict" not in payload:
+                events.append((lane, (payload, entry_id)))
+                continue
+            # Moderated inline by the API; only webhook delivery is left
+            if webhooks is not None and payload.get("tenantId"):
+                webhooks.submit(verdict_event(payload, payload["verdict"]))
+            if entry_id is not None:
+                done.setdefault(lane, []).append(entry_id)
+
+        batch_error = None
+        statuses = []
+        if events:
+            try:
+                statuses = moderate_batch(
+                    [str(payload.get("text") or "") for _, (payload, _) in events]
+                )
+            except Exception as e:
+                logger.exception("Batch moderation failed, scheduling %d retries: %s", len(events), e)
+                batch_error = e
+                statuses = [None] * len(events)
+
+        for (lane, (payload, entry_id)), status in zip(events, statuses):
+            written = None
+            error = batch_error
+            if error is None:
+                try:
+                    written = await process_message(payload, status)
+                except Exception as e:
+                    logger.exception("Error processing message: %s", e)
+                    error = e
+            if error is not None:
+                try:
+                    await retry_queue.schedule(payload, error)
+                except Exception as retry_error:
+                    logger.exception(
+                        "Failed to schedule retry for content_id=%s: %s",
+                        payload.get("contentId"),
+                        retry_error,
+                    )
+                    continue
+            if entry_id is not None:
+                done.setdefault(lane, []).append(entry_id)
+            if written is not None and webhooks is not None and payload.get("tenantId"):
+                webhooks.submit(verdict_event(payload, written))
+
+        if streams is not None:
+            for lane, entry_ids in done.items():
+                try:
+                    await streams.ack(lane, entry_ids)
+                except RedisError as e:
+                    logger.error("Failed to ack %d entries on lane %s: %s", len(entry_ids), lane, e)
+
+
+async def _poll_retries(retry_queue: RetryQueue, scheduler: WeightedFairScheduler) -> None:
+    """
+    Move due retries into the scheduler on their original lane.
+
+    Retries that do not fit in a full lane go back to the retry set, due
+    now, and polling backs off until the next interval.
+    """
+    while True:
+        try:
+            due = await retry_queue.claim_due()
+        except Exception as e:
+            logger.error("Failed to poll retry queue: %s", e)
+            due = []
+        rejected = []
+        for payload in due:
+            lane = payload.get("lane")
+            if lane not in scheduler.weights:
+                lane = settings.default_priority_lane
+            if not scheduler.put(lane, (payload, None)):
+                rejected.append(payload)
+        if rejected:
+            try:
+                await retry_queue.requeue(rejected)
+            except Exception as e:
+                logger.error("Failed to return %d retries to the retry queue: %s", len(rejected), e)
+        if rejected or len(due) < settings.retry_batch_size:
+            await asyncio.sleep(settings.retry_poll_interval_seconds)
+
+
+async def _drain(scheduler: WeightedFairScheduler, idle: asyncio.Event, timeout: float) -> bool:
+    """Wait until buffered and in-flight events are processed. Returns False on timeout."""
+
+    async def _until_drained() -> None:
+        while scheduler.qsize() or not idle.is_set():
+            await asyncio.sleep(0.05)
+
+    try:
+        await asyncio.wait_for(_until_drained(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+async def _log_lane_metrics(
+    scheduler: WeightedFairScheduler,
+    interval: float,
+    webhooks: WebhookDispatcher | None = None,
+) -> None:
+    """Periodically log per-lane depth and lag, event-loop lag and webhook delivery."""
+    while True:
+        await asyncio.sleep(interval)
+        logger.info("Lane metrics: %s", json.dumps(scheduler.snapshot()))
+        logger.info("Event loop lag: %s", json.dumps(get_loop_monitor().snapshot()))
+        if webhooks is not None:
+            logger.info("Webhook delivery: %s", json.dumps(webhooks.stats()))
+
+
+async def run_consumer(
+    stop: asyncio.Event | None = None,
+    worker_index: int = 0,
+) -> None:
+    """
+    Consume the lane streams as one member of the processor consumer group.
+
+    The consumer name is "<hostname>-<worker_index>", so a restarted worker
+    keeps its name. When stop is set, intake stops and buffered and in-flight
+    events are drained, then queued webhooks flushed, all within one
+    processor_drain_timeout_seconds budget; entries not processed by then
+    stay pending and are claimed by another worker.
+    """
+    stop = stop or asyncio.Event()
+    # Fail fast on an unloadable model rather than on every batch
+    load_engine()
     client = redis.from_url(
         settings.redis_url,
         encoding="utf-8",
         decode_responses=True,
     )
 
-    pubsub = client.pubsub()
-    channel = settings.moderation_events_channel
-    await pubsub.subscribe(channel)
+    scheduler = WeightedFairScheduler(
+        settings.priority_lane_weights, max_depth=settings.lane_max_buffered_events
+    )
+    streams = LaneStreams(client, scheduler.lanes, f"{socket.gethostname()}-{worker_index}")
+    await streams.ensure_groups()
 
-    logger.info("Subscribed to channel: %s", channel)
+    logger.info(
+        "Consuming streams %s as %s/%s",
+        ", ".join(streams.streams.values()),
+        streams.group,
+        streams.consumer,
+    )
 
+    idle = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    deadline = None
+    retry_queue = RetryQueue(client)
+    webhooks = WebhookDispatcher() if settings.webhook_subscriptions else None
+    loop_monitor = get_loop_monitor()
+    loop_monitor.start()
     try:
-        async for message in pubsub.listen():
-            if message["type"] == "message":
-                try:
-                    payload = json.loads(message["data"])
-                    await process_message(payload)
-                except json.JSONDecodeError as e:
-                    logger.error("Invalid JSON in message: %s", e)
-                except Exception as e:
-                    logger.exception("Error processing message: %s", e)
+        async with asyncio.TaskGroup() as tg:
+            intake = [
+                tg.create_task(_read_lanes(streams, scheduler)),
+                tg.create_task(_claim_stale(streams, scheduler)),
+                tg.create_task(_poll_retries(retry_queue, scheduler)),
+            ]
+            if settings.sweeper_enabled:
+                intake.append(tg.create_task(run_sweeper(retry_queue)))
+            dispatcher = tg.create_task(
+                _dispatch(scheduler, idle, retry_queue, webhooks, streams)
+            )
+            metrics = tg.create_task(
+                _log_lane_metrics(scheduler, settings.lane_metrics_log_interval_seconds, webhooks)
+            )
+
+            await stop.wait()
+            deadline = loop.time() + settings.processor_drain_timeout_seconds
+            for task in intake:
+                task.cancel()
+            logger.info("Intake stopped, draining %d buffered events", scheduler.qsize())
+            if not await _drain(scheduler, idle, deadline - loop.time()):
+                logger.warning(
+                    "Drain timed out with %d events unprocessed; they stay pending",
+                    scheduler.qsize(),
+                )
+            dispatcher.cancel()
+            metrics.cancel()
     finally:
-        await pubsub.unsubscribe(channel)
-        await pubsub.close()
+        if webhooks is not None:
+            # Whatever the drain left of the shared budget
+            remaining = (
+                settings.processor_drain_timeout_seconds
+                if deadline is None
+                else max(0.0, deadline - loop.time())
+            )
+            await webhooks.close(remaining)
+        await loop_monitor.stop()
         await client.close()
 
 
@@ -0,0 +1,67 @@
+"""
+Dead-letter queue CLI.
+
+Usage:
+    python -m src.processor.dlq stats
+    python -m src.processor.dlq list [--limit N]
+    python -m src.processor.dlq replay [--limit N]
+    python -m src.processor.dlq purge --yes
+    python -m src.processor.dlq forget --yes
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+import redis.asyncio as redis
+
+from src.common.config import settings
+from src.processor.retry import RetryQueue
+
+
+async def _run(args: argparse.Namespace) -> int:
+    client = redis.from_url(settings.redis_url, encoding="utf-8", decode_responses=True)
+    try:
+        queue = RetryQueue(client)
+        if args.command == "stats":
+            print(json.dumps(await queue.stats()))
+        elif args.command == "list":
+            for entry in await queue.list_dead_letters(args.limit):
+                print(json.dumps(entry))
+        elif args.command == "replay":
+            moved = await queue.replay_dead_letters(args.limit)
+            print(f"Replayed {moved} dead letters")
+        elif args.command == "purge":
+            if not args.yes:
+                print("Refusing to purge without --yes", file=sys.stderr)
+                return 1
+            print(f"Purged {await queue.purge_dead_letters()} dead letters")
+        elif args.command == "forget":
+            if not args.yes:
+                print("Refusing to forget purged dead letters without --yes", file=sys.stderr)
+                return 1
+            print(f"Forgot {await queue.forget_purged_dead_letters()} purged dead letters")
+        return 0
+    finally:
+        await client.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect and replay dead-lettered moderation events")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Show retry and dead-letter queue sizes")
+    list_parser = sub.add_parser("list", help="Show the oldest dead letters")
+    list_parser.add_argument("--limit", type=int, default=20)
+    replay_parser = sub.add_parser("replay", help="Requeue dead letters for immediate retry")
+    replay_parser.add_argument("--limit", type=int, default=1000)
+    purge_parser = sub.add_parser("purge", help="Delete all dead letters")
+    purge_parser.add_argument("--yes", action="store_true", help="Confirm deletion")
+    forget_parser = sub.add_parser(
+        "forget", help="Unmark purged content so the sweeper can requeue it if still PENDING"
+    )
+    forget_parser.add_argument("--yes", action="store_true", help="Confirm")
+    sys.exit(asyncio.run(_run(parser.parse_args(argv))))
+
+
+if __name__ == "__main__":
+    main()
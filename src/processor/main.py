@@ -1,9 +1,13 @@
 """Moderation processor entry point."""
+import argparse
 import asyncio
 import logging
+import signal
 import sys
 
+from src.common.instrumentation import schedule_profile_dump
 from src.processor.consumer import run_consumer
+from src.processor.supervisor import Supervisor
 
 logging.basicConfig(
     level=logging.INFO,
@@ -13,13 +17,46 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def main() -> None:
+async def _run_single() -> None:
+    """
+    Run one consumer.
+
+    SIGTERM stops intake and drains in-flight events; SIGUSR1 writes a
+    sampling profile to profile_output_dir.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, stop.set)
+    loop.add_signal_handler(signal.SIGUSR1, schedule_profile_dump)
+    await run_consumer(stop=stop)
+
+
+def main(argv: list[str] | None = None) -> None:
     """Run the moderation processor."""
+    parser = argparse.ArgumentParser(description="Moderation processor")
+    parser.add_argument(
+        "--supervise",
+        action="store_true",
+        help="Run a supervisor that forks worker processes",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes in supervisor mode (default: PROCESSOR_WORKERS or CPU count)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.supervise:
+        Supervisor(workers=args.workers).run()
+        return
+
     logger.info("Starting ModerationProcessor")
     try:
-        asyncio.run(run_consumer())
+        asyncio.run(_run_single())
     except KeyboardInterrupt:
-        logger.info("ModerationProcessor stopped")
+        pass
+    logger.info("ModerationProcessor stopped")
 
 
 if __name__ == "__main__":
@@ -1,7 +1,9 @@
-"""Mock moderation logic."""
+"""Moderation logic: mock keyword/random moderation and the batch engine switch."""
 import logging
 import random
 
+from src.common.config import settings
+
 logger = logging.getLogger(__name__)
 
 # Keyword that triggers rejection
@@ -28,3 +30,53 @@ def moderate_content(text: str) -> str:
     if random.random() < APPROVAL_PROBABILITY:
         return "APPROVED"
     return "REJECTED"
+
+
+def moderate_inline(text: str, max_chars: int) -> str | None:
+    """
+    Moderate small texts synchronously (used by the API fast path).
+
+    Returns:
+        'APPROVED' or 'REJECTED', or None if the text is too large to
+        moderate inline, or (ngram engine) scores too close to the threshold,
+        and should be queued for the processor.
+    """
+    if len(text) > max_chars:
+        return None
+    if settings.moderation_engine != "ngram":
+        return moderate_content(text)
+
+    from src.processor.scoring import get_scoring_model
+
+    model = get_scoring_model()
+    probability = float(model.score([text])[0])
+    if abs(probability - model.threshold) < settings.inline_moderation_ambiguity_margin:
+        return None
+    return "REJECTED" if probability >= model.threshold else "APPROVED"
+
+
+def load_engine() -> None:
+    """
+    Load the configured engine up front (processor startup).
+
+    Raises if the ngram model cannot be loaded, so a bad moderation_model_path
+    stops the processor instead of failing every batch.
+    """
+    if settings.moderation_engine == "ngram":
+        from src.processor.scoring import get_scoring_model
+
+        get_scoring_model()
+
+
+def moderate_batch(texts: list[str]) -> list[str]:
+    """
+    Moderate a micro-batch of texts with the configured engine.
+
+    Returns:
+        'APPROVED' or 'REJECTED' per text, in order.
+    """
+    if settings.moderation_engine == "ngram":
+        from src.processor.scoring import get_scoring_model
+
+        return get_scoring_model().classify(texts)
+    return [moderate_content(text) for text in texts]
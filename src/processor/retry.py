@@ -0,0 +1,242 @@
+"""Delayed retry queue and dead-letter queue for failed moderation events."""
+import json
+import logging
+import random
+import time
+
+import redis.asyncio as redis
+
+from src.common.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Atomically pop up to ARGV[2] members due at or before ARGV[1] and unmark their
+# contentIds in the scheduled-ids set KEYS[2]
+_CLAIM_DUE_SCRIPT = """
+local items = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+if #items > 0 then
+    redis.call('ZREM', KEYS[1], unpack(items))
+    for _, item in ipairs(items) do
+        local ok, payload = pcall(cjson.decode, item)
+        if ok and type(payload) == 'table' and payload['contentId'] then
+            redis.call('SREM', KEYS[2], payload['contentId'])
+        end
+    end
+end
+return items
+"""
+
+# Add payloads ARGV[2..] to the retry set KEYS[1], due at ARGV[1], unless their
+# contentId is already scheduled (KEYS[2]) or dead-lettered (KEYS[3])
+_REQUEUE_SCRIPT = """
+local added = 0
+for i = 2, #ARGV do
+    local id = cjson.decode(ARGV[i])['contentId']
+    if redis.call('SISMEMBER', KEYS[2], id) == 0 and redis.call('SISMEMBER', KEYS[3], id) == 0 then
+        redis.call('ZADD', KEYS[1], ARGV[1], ARGV[i])
+        redis.call('SADD', KEYS[2], id)
+        added = added + 1
+    end
+end
+return added
+"""
+
+# Move up to ARGV[2] dead letters (oldest first) back to the retry set, due at ARGV[1],
+# with a fresh attempt budget; their contentIds move from KEYS[4] to KEYS[3]
+_REPLAY_SCRIPT = """
+local moved = 0
+for i = 1, tonumber(ARGV[2]) do
+    local item = redis.call('RPOP', KEYS[1])
+    if not item then
+        break
+    end
+    local payload = cjson.decode(item)
+    payload['attempts'] = 0
+    payload['deadLetteredAt'] = nil
+    redis.call('ZADD', KEYS[2], ARGV[1], cjson.encode(payload))
+    if payload['contentId'] then
+        redis.call('SREM', KEYS[4], payload['contentId'])
+        redis.call('SADD', KEYS[3], payload['contentId'])
+    end
+    moved = moved + 1
+end
+return moved
+"""
+
+# Unmark contentIds in KEYS[2] that are no longer in the dead-letter list KEYS[1]
+# (purged); returns how many were unmarked
+_FORGET_PURGED_SCRIPT = """
+local listed = {}
+for _, item in ipairs(redis.call('LRANGE', KEYS[1], 0, -1)) do
+    local ok, payload = pcall(cjson.decode, item)
+    if ok and type(payload) == 'table' and payload['contentId'] then
+        listed[payload['contentId']] = true
+    end
+end
+local removed = 0
+for _, id in ipairs(redis.call('SMEMBERS', KEYS[2])) do
+    if not listed[id] then
+        redis.call('SREM', KEYS[2], id)
+        removed = removed + 1
+    end
+end
+return removed
+"""
+
+
+def backoff_delay(
+    attempts: int,
+    base: float | None = None,
+    cap: float | None = None,
+) -> float:
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2**(attempts-1)))."""
+    base = base if base is not None else settings.retry_backoff_base_seconds
+    cap = cap if cap is not None else settings.retry_backoff_max_seconds
+    return random.uniform(0, min(cap, base * 2 ** max(attempts - 1, 0)))
+
+
+class RetryQueue:
+    """
+    Redis-backed delayed retries with a dead-letter list.
+
+    - Retries live in a sorted set scored by due time (epoch seconds).
+    - After retry_max_attempts failures, events move to the dead-letter list.
+    - Payloads carry their failure count in "attempts" and the last error in "lastError".
+    - The contentIds of scheduled and dead-lettered events are kept in two sets
+      ("<key>:ids"), so requeue() never duplicates a scheduled retry or
+      revives a dead letter with a fresh attempt budget.
+    """
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+        self.retry_key = settings.retry_queue_key
+        self.dead_letter_key = settings.dead_letter_queue_key
+        self.retry_ids_key = f"{self.retry_key}:ids"
+        self.dead_letter_ids_key = f"{self.dead_letter_key}:ids"
+        self.max_attempts = settings.retry_max_attempts
+        self._claim_due = client.register_script(_CLAIM_DUE_SCRIPT)
+        self._requeue = client.register_script(_REQUEUE_SCRIPT)
+        self._replay = client.register_script(_REPLAY_SCRIPT)
+        self._forget_purged = client.register_script(_FORGET_PURGED_SCRIPT)
+
+    async def schedule(self, payload: dict, error: Exception | str) -> bool:
+        """
+        Record a failed attempt.
+
+        The payload and its contentId mark are written in one MULTI, so a
+        scheduled retry or dead letter is never left unmarked.
+
+        Returns:
+            True if rescheduled, False if moved to the dead-letter queue.
+        """
+        attempts = int(payload.get("attempts", 0)) + 1
+        payload = {**payload, "attempts": attempts, "lastError": str(error)[:500]}
+
+        if attempts >= self.max_attempts:
+            payload["deadLetteredAt"] = time.time()
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.lpush(self.dead_letter_key, json.dumps(payload))
+                if payload.get("contentId"):
+                    pipe.sadd(self.dead_letter_ids_key, payload["contentId"])
+                await pipe.execute()
+            logger.error(
+                "Dead-lettered content_id=%s after %d attempts: %s",
+                payload.get("contentId"),
+                attempts,
+                payload["lastError"],
+            )
+            return False
+
+        delay = backoff_delay(attempts)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.zadd(self.retry_key, {json.dumps(payload): time.time() + delay})
+            if payload.get("contentId"):
+                pipe.sadd(self.retry_ids_key, payload["contentId"])
+            await pipe.execute()
+        logger.warning(
+            "Scheduled retry %d for content_id=%s in %.1fs",
+            attempts,
+            payload.get("contentId"),
+            delay,
+        )
+        return True
+
+    async def requeue(self, payloads: list[dict]) -> int:
+        """
+        Make payloads due now without counting an attempt.
+
+        Payloads whose contentId is already scheduled or dead-lettered are
+        skipped. Every payload must carry a contentId.
+
+        Returns:
+            Number of payloads added.
+        """
+        if not payloads:
+            return 0
+        return await self._requeue(
+            keys=[self.retry_key, self.retry_ids_key, self.dead_letter_ids_key],
+            args=[time.time(), *(json.dumps(p) for p in payloads)],
+        )
+
+    async def claim_due(self, limit: int | None = None) -> list[dict]:
+        """Atomically remove and return retries that are due."""
+        limit = limit or settings.retry_batch_size
+        items = await self._claim_due(
+            keys=[self.retry_key, self.retry_ids_key], args=[time.time(), limit]
+        )
+        claimed = []
+        for item in items:
+            try:
+                claimed.append(json.loads(item))
+            except json.JSONDecodeError as e:
+                logger.error("Dropping invalid retry entry: %s", e)
+        return claimed
+
+    async def stats(self) -> dict:
+        return {
+            "retry_scheduled": await self.client.zcard(self.retry_key),
+            "dead_letters": await self.client.llen(self.dead_letter_key),
+        }
+
+    async def list_dead_letters(self, limit: int = 20) -> list[dict]:
+        """Oldest dead letters first."""
+        items = await self.client.lrange(self.dead_letter_key, -limit, -1)
+        return [json.loads(item) for item in reversed(items)]
+
+    async def replay_dead_letters(self, limit: int = 1000) -> int:
+        """Move up to limit dead letters back to the retry set, due now."""
+        return await self._replay(
+            keys=[
+                self.dead_letter_key,
+                self.retry_key,
+                self.retry_ids_key,
+                self.dead_letter_ids_key,
+            ],
+            args=[time.time(), limit],
+        )
+
+    async def purge_dead_letters(self) -> int:
+        """
+        Delete all dead letters.
+
+        Their contentIds stay marked as dead-lettered, so the sweeper does not
+        requeue the purged content; forget_purged_dead_letters() drops the marks.
+        """
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.llen(self.dead_letter_key)
+            pipe.delete(self.dead_letter_key)
+            count, _ = await pipe.execute()
+        return count
+
+    async def forget_purged_dead_letters(self) -> int:
+        """
+        Unmark the contentIds of purged dead letters.
+
+        The dead-lettered ids set is only trimmed here (and by replay), so it
+        otherwise grows with every purge. Content that is still PENDING is
+        requeued by the sweeper once unmarked.
+
+        Returns:
+            Number of contentIds unmarked.
+        """
+        return await self._forget_purged(keys=[self.dead_letter_key, self.dead_letter_ids_key])
@@ -0,0 +1,127 @@
+"""Weighted fair scheduling across priority lanes."""
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+
+class LaneMetrics:
+    """Per-lane dispatch count and submit-to-dispatch lag."""
+
+    def __init__(self, window: int = 1024):
+        self.dispatched = 0
+        self.dropped = 0
+        self.max_lag = 0.0
+        self._lags: Deque[float] = deque(maxlen=window)
+
+    def record(self, lag: float) -> None:
+        self.dispatched += 1
+        self.max_lag = max(self.max_lag, lag)
+        self._lags.append(lag)
+
+    def percentile(self, pct: float) -> float:
+        """Lag percentile over the recent window (0.0 if empty)."""
+        if not self._lags:
+            return 0.0
+        ordered = sorted(self._lags)
+        index = min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1)
+        return ordered[max(index, 0)]
+
+
+class WeightedFairScheduler:
+    """
+    Smooth weighted round-robin over per-lane FIFO queues.
+
+    - Each non-empty lane gets dispatches in proportion to its weight.
+    - Empty lanes are skipped, so a lone low lane runs at full speed.
+    - Every non-empty lane is picked at least once per round (no starvation).
+    - Each lane buffers at most max_depth items; put() rejects (and counts)
+      items beyond that instead of growing without bound.
+    """
+
+    def __init__(self, weights: Dict[str, int], max_depth: int | None = None):
+        if not weights or any(w <= 0 for w in weights.values()):
+            raise ValueError("Lane weights must be positive")
+        self.weights = dict(weights)
+        self.max_depth = max_depth
+        self._queues: Dict[str, Deque[tuple[Any, float]]] = {lane: deque() for lane in weights}
+        self._current: Dict[str, int] = {lane: 0 for lane in weights}
+        self._not_empty = asyncio.Event()
+        self.metrics: Dict[str, LaneMetrics] = {lane: LaneMetrics() for lane in weights}
+
+    @property
+    def lanes(self) -> list[str]:
+        return list(self.weights)
+
+    def put(self, lane: str, item: Any, submitted_at: float | None = None) -> bool:
+        """
+        Enqueue item on a lane. submitted_at (epoch seconds) is used for lag.
+
+        Returns:
+            False if the lane is full and the item was dropped.
+        """
+        if lane not in self._queues:
+            raise KeyError(f"Unknown lane: {lane}")
+        if self.max_depth is not None and len(self._queues[lane]) >= self.max_depth:
+            self.metrics[lane].dropped += 1
+            return False
+        self._queues[lane].append((item, submitted_at or time.time()))
+        self._not_empty.set()
+        return True
+
+    def room(self, lane: str) -> int | None:
+        """Items the lane can still take, or None if it is unbounded."""
+        if self.max_depth is None:
+            return None
+        return max(self.max_depth - len(self._queues[lane]), 0)
+
+    def _pick(self) -> str:
+        total = 0
+        best = None
+        for lane, queue in self._queues.items():
+            if not queue:
+                continue
+            self._current[lane] += self.weights[lane]
+            total += self.weights[lane]
+            if best is None or self._current[lane] > self._current[best]:
+                best = lane
+        if best is None:
+            raise asyncio.QueueEmpty
+        self._current[best] -= total
+        return best
+
+    def get_nowait(self) -> tuple[str, Any]:
+        """Dispatch the next item. Raises asyncio.QueueEmpty if all lanes are empty."""
+        lane = self._pick()
+        item, submitted_at = self._queues[lane].popleft()
+        self.metrics[lane].record(max(0.0, time.time() - submitted_at))
+        if not self.qsize():
+            self._not_empty.clear()
+        return lane, item
+
+    async def get(self) -> tuple[str, Any]:
+        """Wait for and dispatch the next item."""
+        while not self.qsize():
+            await self._not_empty.wait()
+        return self.get_nowait()
+
+    def qsize(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def depths(self) -> Dict[str, int]:
+        return {lane: len(queue) for lane, queue in self._queues.items()}
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Per-lane depth, dispatched and dropped counts, and lag metrics (seconds)."""
+        return {
+            lane: {
+                "depth": len(self._queues[lane]),
+                "dispatched": m.dispatched,
+                "dropped": m.dropped,
+                "lag_p50": round(m.percentile(50), 4),
+                "lag_p99": round(m.percentile(99), 4),
+                "lag_max": round(m.max_lag, 4),
+            }
+            for lane, m in self.metrics.items()
+        }
@@ -0,0 +1,209 @@
+"""
+Hashed n-gram linear scoring model for batch moderation.
+
+Texts are mapped to a fixed-size feature space by hashing character n-grams
+and word unigrams/bigrams (the hashing trick). A micro-batch is scored with a
+single sparse matrix-vector product against a linear model whose weights are
+memory-mapped from disk, so every processor worker shares one copy.
+
+All hashing is vectorized over the whole batch: the texts are concatenated
+into one byte array and any substring hash is derived from prefix sums
+(polynomial hash mod 2**64 with an odd, hence invertible, base).
+"""
+import logging
+import struct
+
+import numpy as np
+
+from src.common.config import settings
+
+logger = logging.getLogger(__name__)
+
+_BASE = 0x100000001B3  # odd, so invertible mod 2**64
+_BASE_INV = pow(_BASE, -1, 2**64)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+# Feature families get distinct salts so e.g. a 3-gram never aliases a word
+_WORD_SALT = 0x5745
+_BIGRAM_SALT = 0x4247
+
+# Bytes that belong to a word: ASCII letters/digits, '_' and any UTF-8 non-ASCII byte
+_WORD_BYTES = np.zeros(256, dtype=bool)
+for _c in b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_":
+    _WORD_BYTES[_c] = True
+_WORD_BYTES[128:] = True
+
+
+def _mix(h: np.ndarray, salt: int, bits: int) -> np.ndarray:
+    """Salt and finalize 64-bit hashes into feature indices (multiplicative hashing)."""
+    return ((h ^ np.uint64(salt)) * _MIX) >> np.uint64(64 - bits)
+
+
+class HashedNgramModel:
+    """
+    Logistic model over hashed n-gram counts.
+
+    File layout (little endian): 64-byte header
+    (magic, feature bits, char n-gram min/max, bias, threshold)
+    followed by 2**bits float32 weights.
+    """
+
+    MAGIC = b"CMNGRAM1"
+    HEADER = struct.Struct("<8sIIIdd")
+    HEADER_SIZE = 64
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        bias: float = 0.0,
+        threshold: float = 0.5,
+        char_ngram_range: tuple[int, int] = (3, 5),
+    ):
+        bits = int(weights.shape[0]).bit_length() - 1
+        if weights.ndim != 1 or weights.shape[0] != 1 << bits:
+            raise ValueError("weights must be a 1-D array of length 2**bits")
+        self.weights = weights
+        self.bits = bits
+        self.bias = float(bias)
+        self.threshold = float(threshold)
+        self.char_ngram_range = char_ngram_range
+        self._power_cache = (np.ones(1, dtype=np.uint64), np.ones(0, dtype=np.uint64))
+
+    @classmethod
+    def load(cls, path: str) -> "HashedNgramModel":
+        """Load a model; weights are memory-mapped read-only."""
+        with open(path, "rb") as f:
+            magic, bits, n_min, n_max, bias, threshold = cls.HEADER.unpack(
+                f.read(cls.HEADER.size)
+            )
+        if magic != cls.MAGIC:
+            raise ValueError(f"{path} is not a hashed n-gram model")
+        weights = np.memmap(path, dtype="<f4", mode="r", offset=cls.HEADER_SIZE, shape=(1 << bits,))
+        return cls(weights, bias, threshold, (n_min, n_max))
+
+    def save(self, path: str) -> None:
+        header = self.HEADER.pack(
+            self.MAGIC, self.bits, *self.char_ngram_range, self.bias, self.threshold
+        )
+        with open(path, "wb") as f:
+            f.write(header.ljust(self.HEADER_SIZE, b"\0"))
+            f.write(np.asarray(self.weights, dtype="<f4").tobytes())
+
+    @classmethod
+    def from_keywords(
+        cls,
+        keywords: dict[str, float],
+        bits: int = 20,
+        bias: float = -4.0,
+        threshold: float = 0.5,
+    ) -> "HashedNgramModel":
+        """Bootstrap model: weights on the word features of each keyword, zero elsewhere."""
+        model = cls(np.zeros(1 << bits, dtype=np.float32), bias, threshold)
+        for keyword, weight in keywords.items():
+            _, word_indices = model._word_features(*model._encode([keyword]))
+            model.weights[word_indices] = weight
+        return model
+
+    def _powers(self, size: int) -> tuple[np.ndarray, np.ndarray]:
+        """Base powers (size + 1) and inverse base powers (size), cached and grown on demand."""
+        if self._power_cache[1].shape[0] < size:
+            capacity = max(size, 2 * self._power_cache[1].shape[0], 4096)
+            powers = np.empty(capacity + 1, dtype=np.uint64)
+            powers[0] = 1
+            np.cumprod(np.full(capacity, _BASE, dtype=np.uint64), out=powers[1:])
+            inv_powers = np.empty(capacity, dtype=np.uint64)
+            inv_powers[0] = 1
+            np.cumprod(np.full(capacity - 1, _BASE_INV, dtype=np.uint64), out=inv_powers[1:])
+            self._power_cache = (powers, inv_powers)
+        powers, inv_powers = self._power_cache
+        return powers[: size + 1], inv_powers[:size]
+
+    def _encode(self, texts: list[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Concatenate space-padded, lowercased texts.
+
+        Returns (bytes, row of each byte, base powers, prefix sums of inverse-power-weighted bytes).
+        """
+        encoded = [(" " + t.lower() + " ").encode("utf-8", "replace") for t in texts]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        row_of_byte = np.repeat(np.arange(len(texts)), lengths)
+
+        size = data.shape[0]
+        powers, inv_powers = self._powers(size)
+        prefix = np.zeros(size + 1, dtype=np.uint64)
+        np.cumsum(data.astype(np.uint64) * inv_powers, out=prefix[1:])
+        return data, row_of_byte, powers, prefix
+
+    @staticmethod
+    def _span_hash(powers: np.ndarray, prefix: np.ndarray, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        """Polynomial hash of data[start:end] for many spans at once."""
+        return powers[end - 1] * (prefix[end] - prefix[start])
+
+    def _char_features(self, data, row_of_byte, powers, prefix) -> tuple[np.ndarray, np.ndarray]:
+        rows, indices = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.uint64)]
+        size = data.shape[0]
+        n_min, n_max = self.char_ngram_range
+        for n in range(n_min, min(n_max, size) + 1):
+            # Hash of data[s:s+n] for every s at once (slices instead of gathers)
+            hashes = powers[n - 1 : size] * (prefix[n:] - prefix[: size - n + 1])
+            # Drop n-grams spanning two texts
+            keep = row_of_byte[: size - n + 1] == row_of_byte[n - 1 :]
+            rows.append(row_of_byte[: size - n + 1][keep])
+            indices.append(_mix(hashes[keep], n, self.bits))
+        return np.concatenate(rows), np.concatenate(indices)
+
+    def _word_features(self, data, row_of_byte, powers, prefix) -> tuple[np.ndarray, np.ndarray]:
+        is_word = _WORD_BYTES[data]
+        edges = np.diff(np.concatenate(([False], is_word, [False])).astype(np.int8))
+        start = np.flatnonzero(edges == 1)
+        end = np.flatnonzero(edges == -1)
+        word_hash = self._span_hash(powers, prefix, start, end)
+        word_rows = row_of_byte[start]
+
+        # Bigrams of consecutive words in the same text
+        same_text = word_rows[:-1] == word_rows[1:]
+        bigram_hash = word_hash[:-1][same_text] * np.uint64(_BASE) + word_hash[1:][same_text]
+        return (
+            np.concatenate((word_rows, word_rows[:-1][same_text])),
+            np.concatenate(
+                (_mix(word_hash, _WORD_SALT, self.bits), _mix(bigram_hash, _BIGRAM_SALT, self.bits))
+            ),
+        )
+
+    def featurize(self, texts: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Sparse batch features as (row, feature index) pairs; repeats act as counts."""
+        encoded = self._encode(texts)
+        char_rows, char_indices = self._char_features(*encoded)
+        word_rows, word_indices = self._word_features(*encoded)
+        return np.concatenate((char_rows, word_rows)), np.concatenate((char_indices, word_indices))
+
+    def score(self, texts: list[str]) -> np.ndarray:
+        """Rejection probability per text."""
+        if not texts:
+            return np.zeros(0)
+        rows, indices = self.featurize(texts)
+        # Sparse (texts x features) count matrix times the weight vector
+        logits = self.bias + np.bincount(rows, weights=self.weights[indices], minlength=len(texts))
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def classify(self, texts: list[str]) -> list[str]:
+        """'REJECTED' where the rejection probability reaches the threshold, else 'APPROVED'."""
+        return ["REJECTED" if p >= self.threshold else "APPROVED" for p in self.score(texts)]
+
+
+_model: HashedNgramModel | None = None
+
+
+def get_scoring_model() -> HashedNgramModel:
+    """Get or load the process-wide model (moderation_model_path, else keyword bootstrap)."""
+    global _model
+    if _model is None:
+        if settings.moderation_model_path:
+            _model = HashedNgramModel.load(settings.moderation_model_path)
+            logger.info("Loaded moderation model from %s", settings.moderation_model_path)
+        else:
+            from src.processor.moderation import REJECT_KEYWORD
+
+            _model = HashedNgramModel.from_keywords({REJECT_KEYWORD: 10.0})
+            logger.warning("No MODERATION_MODEL_PATH set, using keyword bootstrap model")
+    return _model
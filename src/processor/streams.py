@@ -0,0 +1,145 @@
+"""Consumer-group reads of the per-lane ContentSubmitted streams."""
+import json
+import logging
+from typing import Any
+
+import redis.asyncio as redis
+from redis.exceptions import ResponseError
+
+from src.common.config import settings
+from src.common.lanes import stream_for_lane
+
+logger = logging.getLogger(__name__)
+
+# (lane, entry_id, payload); payload is None if the entry is not a JSON object
+StreamEntry = tuple[str, str, dict | None]
+
+
+def _decode(fields: Any) -> dict | None:
+    try:
+        payload = json.loads(fields["data"])
+    except (TypeError, KeyError, json.JSONDecodeError) as e:
+        logger.error("Invalid stream entry: %s", e)
+        return None
+    if not isinstance(payload, dict):
+        logger.error("Invalid payload: expected a JSON object")
+        return None
+    return payload
+
+
+def _entry_time(entry_id: str) -> float:
+    """Epoch seconds encoded in a stream entry id ("<ms>-<seq>")."""
+    return int(entry_id.split("-")[0]) / 1000
+
+
+class LaneStreams:
+    """
+    One consumer of the processor group on every lane stream.
+
+    - Each entry is delivered to exactly one consumer of the group.
+    - Entries stay in the group's pending list until ack(), so an event
+      buffered or in flight in a worker that crashes or stops is not lost.
+    - claim_stale() takes over entries pending longer than
+      stream_claim_idle_seconds, whichever consumer they were delivered to.
+    """
+
+    def __init__(self, client: redis.Redis, lanes: list[str], consumer: str):
+        self.client = client
+        self.group = settings.processor_consumer_group
+        self.consumer = consumer
+        self.streams = {lane: stream_for_lane(lane) for lane in lanes}
+        self._lanes = {stream: lane for lane, stream in self.streams.items()}
+        self._claim_cursors = {lane: "0-0" for lane in lanes}
+
+    async def ensure_groups(self) -> None:
+        """Create the consumer group on every lane stream (and the streams) if missing."""
+        for stream in self.streams.values():
+            try:
+                await self.client.xgroup_create(stream, self.group, id="0", mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    async def read(self, room: dict[str, int | None], block: float | None = None) -> list[StreamEntry]:
+        """
+        Read new entries from the lanes with room, blocking up to block seconds.
+
+        room maps lane -> free buffer slots (None = unbounded); lanes without
+        room are not read, so their entries wait in the stream. Each lane is
+        read with its own count, so a nearly full lane does not throttle the
+        others. Only when no lane has new entries does one read block on all
+        of them.
+        """
+        limits = {
+            lane: settings.stream_read_count if free is None else min(free, settings.stream_read_count)
+            for lane, free in room.items()
+        }
+        limits = {lane: limit for lane, limit in limits.items() if limit > 0}
+        if not limits:
+            return []
+        entries = []
+        for lane, limit in limits.items():
+            response = await self.client.xreadgroup(
+                self.group, self.consumer, {self.streams[lane]: ">"}, count=limit
+            )
+            entries += self._entries(response)
+        if entries:
+            return entries
+        block = block if block is not None else settings.stream_read_block_seconds
+        response = await self.client.xreadgroup(
+            self.group,
+            self.consumer,
+            {self.streams[lane]: ">" for lane in limits},
+            # COUNT applies per stream; any lane can take this many
+            count=min(limits.values()),
+            block=int(block * 1000),
+        )
+        return self._entries(response)
+
+    def _entries(self, response: Any) -> list[StreamEntry]:
+        return [
+            (self._lanes[stream], entry_id, _decode(fields))
+            for stream, entries in response or []
+            for entry_id, fields in entries
+        ]
+
+    async def claim_stale(self, lane: str, limit: int) -> list[StreamEntry]:
+        """Claim up to limit entries of lane pending longer than stream_claim_idle_seconds."""
+        result = await self.client.xautoclaim(
+            self.streams[lane],
+            self.group,
+            self.consumer,
+            min_idle_time=int(settings.stream_claim_idle_seconds * 1000),
+            start_id=self._claim_cursors[lane],
+            count=limit,
+        )
+        # The cursor returns to 0-0 once the whole pending list has been scanned
+        self._claim_cursors[lane] = result[0]
+        # Entries trimmed from the stream while pending come back without fields
+        return [(lane, entry_id, _decode(fields)) for entry_id, fields in result[1] if fields]
+
+    async def oldest_unacked(self, lane: str) -> float | None:
+        """
+        Time (epoch seconds) of the oldest lane entry the group has not acked.
+
+        That is the oldest pending entry or, failing that, the first entry not
+        yet delivered. None if every entry in the stream has been acked.
+        """
+        stream = self.streams[lane]
+        try:
+            groups = await self.client.xinfo_groups(stream)
+        except ResponseError:  # no such stream
+            return None
+        group = next((g for g in groups if g["name"] == self.group), None)
+        if group is None:
+            first = await self.client.xrange(stream, count=1)
+        else:
+            pending = await self.client.xpending(stream, self.group)
+            if pending["pending"]:
+                return _entry_time(pending["min"])
+            first = await self.client.xrange(stream, min=f"({group['last-delivered-id']}", count=1)
+        return _entry_time(first[0][0]) if first else None
+
+    async def ack(self, lane: str, entry_ids: list[str]) -> None:
+        if entry_ids:
+            await self.client.xack(self.streams[lane], self.group, *entry_ids)
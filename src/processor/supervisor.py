@@ -0,0 +1,234 @@
+"""Multi-process supervisor for the moderation processor."""
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from src.common.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds between worker heartbeats
+HEARTBEAT_INTERVAL = 5.0
+# A worker that ran this long before exiting resets its restart backoff
+STABLE_RUNTIME = 60.0
+RESTART_BACKOFF_BASE = 0.5
+# Time a stopping worker gets beyond its drain timeout to close its connections
+# before it is killed
+SHUTDOWN_GRACE = 5.0
+
+
+def restart_delay(failures: int, cap: float | None = None) -> float:
+    """Exponential restart backoff: 0.5s, 1s, 2s, ... capped."""
+    cap = cap if cap is not None else settings.processor_restart_backoff_max_seconds
+    if failures <= 0:
+        return 0.0
+    return min(cap, RESTART_BACKOFF_BASE * 2 ** (failures - 1))
+
+
+async def _heartbeat(heartbeats: Any, index: int) -> None:
+    while True:
+        heartbeats[index] = time.time()
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+
+async def _run_worker(index: int, count: int, heartbeats: Any) -> None:
+    from src.common.instrumentation import schedule_profile_dump
+    from src.processor.consumer import run_consumer
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, stop.set)
+    loop.add_signal_handler(signal.SIGUSR1, schedule_profile_dump)
+
+    beat = asyncio.create_task(_heartbeat(heartbeats, index))
+    try:
+        await run_consumer(stop=stop, worker_index=index)
+    finally:
+        beat.cancel()
+
+
+def worker_main(index: int, count: int, heartbeats: Any) -> None:
+    """Worker process entry point: consumer index of count in the processor group."""
+    # The supervisor owns Ctrl-C and forwards SIGTERM
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f"%(asctime)s - worker-{index} - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stdout,
+    )
+    asyncio.run(_run_worker(index, count, heartbeats))
+
+
+@dataclass
+class WorkerSlot:
+    """Supervisor bookkeeping for one worker index."""
+
+    index: int
+    process: Any = None
+    started_at: float = 0.0
+    restarts: int = 0
+    failures: int = 0
+    next_start_at: float = 0.0
+    last_exitcode: int | None = field(default=None)
+
+
+class Supervisor:
+    """
+    Forks N consumer workers and keeps them running.
+
+    - Crashed workers are restarted with exponential backoff.
+    - SIGTERM/SIGINT stops intake in every worker and waits for them to drain.
+    - SIGUSR1 is forwarded to every worker, each of which writes a profile.
+    - health() aggregates liveness and heartbeat age per worker.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        target: Callable[[int, int, Any], None] = worker_main,
+        drain_timeout: float | None = None,
+    ):
+        self.workers = workers or settings.processor_workers or os.cpu_count() or 1
+        self.target = target
+        self.drain_timeout = (
+            drain_timeout if drain_timeout is not None else settings.processor_drain_timeout_seconds
+        )
+        self._ctx = multiprocessing.get_context("spawn")
+        self._heartbeats = self._ctx.Array("d", self.workers, lock=False)
+        self._slots = [WorkerSlot(index=i) for i in range(self.workers)]
+        self._stopping = False
+
+    def _start(self, slot: WorkerSlot) -> None:
+        slot.process = self._ctx.Process(
+            target=self.target,
+            args=(slot.index, self.workers, self._heartbeats),
+            name=f"moderation-worker-{slot.index}",
+        )
+        slot.process.start()
+        slot.started_at = time.monotonic()
+        self._heartbeats[slot.index] = time.time()
+        logger.info("Started worker %d (pid=%s)", slot.index, slot.process.pid)
+
+    def start(self) -> None:
+        for slot in self._slots:
+            self._start(slot)
+
+    def check_workers(self) -> None:
+        """Reap exited workers and restart them once their backoff has elapsed."""
+        if self._stopping:
+            return
+        now = time.monotonic()
+        for slot in self._slots:
+            proc = slot.process
+            if proc is not None and proc.is_alive():
+                continue
+            if proc is not None:
+                proc.join(timeout=0)
+                slot.last_exitcode = proc.exitcode
+                slot.failures = 1 if now - slot.started_at >= STABLE_RUNTIME else slot.failures + 1
+                slot.next_start_at = now + restart_delay(slot.failures)
+                slot.process = None
+                logger.warning(
+                    "Worker %d exited with code %s, restarting in %.1fs",
+                    slot.index,
+                    slot.last_exitcode,
+                    slot.next_start_at - now,
+                )
+            if now >= slot.next_start_at:
+                slot.restarts += 1
+                self._start(slot)
+
+    def health(self) -> dict:
+        """Aggregated per-worker health."""
+        now = time.time()
+        workers = []
+        for slot in self._slots:
+            alive = slot.process is not None and slot.process.is_alive()
+            age = now - self._heartbeats[slot.index]
+            workers.append(
+                {
+                    "index": slot.index,
+                    "pid": slot.process.pid if slot.process is not None else None,
+                    "alive": alive,
+                    "heartbeat_age": round(age, 1),
+                    "restarts": slot.restarts,
+                    "last_exitcode": slot.last_exitcode,
+                }
+            )
+        stale_after = HEARTBEAT_INTERVAL * 3
+        healthy = sum(1 for w in workers if w["alive"] and w["heartbeat_age"] < stale_after)
+        return {
+            "status": "healthy" if healthy == self.workers else "degraded" if healthy else "unhealthy",
+            "workers_total": self.workers,
+            "workers_healthy": healthy,
+            "workers": workers,
+        }
+
+    def _report_health(self) -> None:
+        report = self.health()
+        logger.info(
+            "Supervisor health: %s (%d/%d workers healthy)",
+            report["status"],
+            report["workers_healthy"],
+            report["workers_total"],
+        )
+        if settings.processor_health_file:
+            tmp = f"{settings.processor_health_file}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(report, f)
+            os.replace(tmp, settings.processor_health_file)
+
+    def stop(self) -> None:
+        """
+        Ask every worker to drain and exit.
+
+        A worker drains and flushes webhooks within drain_timeout, so one
+        still running SHUTDOWN_GRACE seconds after that is killed.
+        """
+        self._stopping = True
+        running = [s.process for s in self._slots if s.process is not None and s.process.is_alive()]
+        logger.info("Stopping %d workers (drain timeout %.0fs)", len(running), self.drain_timeout)
+        for proc in running:
+            proc.terminate()  # SIGTERM -> graceful drain in the worker
+        deadline = time.monotonic() + self.drain_timeout + SHUTDOWN_GRACE
+        for proc in running:
+            proc.join(timeout=max(0.0, deadline - time.monotonic()))
+            if proc.is_alive():
+                logger.warning("Worker pid=%s did not drain in time, killing", proc.pid)
+                proc.kill()
+                proc.join()
+
+    def _request_stop(self, signum: int, frame: Any) -> None:
+        logger.info("Received signal %d, shutting down", signum)
+        self._stopping = True
+
+    def _forward_profile_signal(self, signum: int, frame: Any) -> None:
+        for slot in self._slots:
+            if slot.process is not None and slot.process.is_alive():
+                os.kill(slot.process.pid, signal.SIGUSR1)
+
+    def run(self) -> None:
+        """Run until SIGTERM/SIGINT, then drain all workers."""
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGUSR1, self._forward_profile_signal)
+        logger.info("Supervisor starting %d workers", self.workers)
+        self.start()
+        next_report = time.monotonic() + settings.processor_health_interval_seconds
+        try:
+            while not self._stopping:
+                time.sleep(0.5)
+                self.check_workers()
+                if time.monotonic() >= next_report:
+                    self._report_health()
+                    next_report = time.monotonic() + settings.processor_health_interval_seconds
+        finally:
+            self.stop()
+        logger.info("Supervisor stopped")
@@ -0,0 +1,200 @@
+"""
+PENDING reconciliation sweeper.
+
+Events can be lost between create_content and the consumer (a failed or skipped
+publish, or a stream entry trimmed before it was read). The sweeper finds content that has been PENDING longer than
+sweeper_min_age_seconds and requeues it through the retry queue into the lane it
+was submitted to, skipping content that is already scheduled for retry or
+dead-lettered. Content submitted after the oldest unacked entry of its lane
+stream may still be waiting there, so each lane's cutoff is also held back to
+that entry: a backlogged lane is not moderated twice.
+
+Run standalone with `python -m src.processor.sweeper [--once]`, or let the
+processor run it (sweeper_enabled). A Postgres advisory lock ensures only one
+sweeper runs at a time across replicas.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import redis.asyncio as redis
+from sqlalchemy import or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.common.config import settings
+from src.common.database import async_session_maker, engine
+from src.common.models import Content, ModerationResult
+from src.processor.retry import RetryQueue
+from src.processor.streams import LaneStreams
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock key shared by all sweeper instances
+SWEEPER_LOCK_KEY = 0x4D4F4453  # "MODS"
+
+# created_at (Postgres clock, before the insert) precedes its stream entry id
+# (Redis clock, at XADD); allow for that gap and for clock skew
+STREAM_CLOCK_MARGIN_SECONDS = 30
+
+
+def _lane_filter(lane: str):
+    """Content of lane; rows without a known lane belong to the default lane."""
+    if lane != settings.default_priority_lane:
+        return Content.lane == lane
+    others = [other for other in settings.priority_lane_weights if other != lane]
+    return or_(Content.lane.is_(None), Content.lane.notin_(others))
+
+
+async def fetch_stuck_batch(
+    session: AsyncSession,
+    cutoff: datetime,
+    after: uuid.UUID | None,
+    limit: int,
+    lane: str | None = None,
+) -> list[tuple[uuid.UUID, str, str, datetime, str | None]]:
+    """
+    Next batch of (content_id, user_id, text, created_at, tenant_id) still PENDING and
+    created before cutoff, only from lane if given.
+
+    Keyset-paginated on content_id so the partial PENDING index drives the scan.
+    """
+    stmt = (
+        select(Content.id, Content.user_id, Content.text, Content.created_at, Content.tenant_id)
+        .join(ModerationResult, ModerationResult.content_id == Content.id)
+        .where(ModerationResult.status == "PENDING", Content.created_at < cutoff)
+        .order_by(ModerationResult.content_id)
+        .limit(limit)
+    )
+    if after is not None:
+        stmt = stmt.where(ModerationResult.content_id > after)
+    if lane is not None:
+        stmt = stmt.where(_lane_filter(lane))
+    result = await session.execute(stmt)
+    return [tuple(row) for row in result.all()]
+
+
+async def lane_cutoffs(streams: LaneStreams, now: datetime) -> dict[str, datetime]:
+    """
+    Per-lane creation cutoff for stuck content.
+
+    sweeper_min_age_seconds ago, or earlier if the lane stream still has an
+    older entry that is pending or not yet delivered.
+    """
+    min_age_cutoff = now - timedelta(seconds=settings.sweeper_min_age_seconds)
+    cutoffs = {}
+    for lane in streams.streams:
+        oldest = await streams.oldest_unacked(lane)
+        if oldest is None:
+            cutoffs[lane] = min_age_cutoff
+        else:
+            backlog_cutoff = datetime.fromtimestamp(oldest - STREAM_CLOCK_MARGIN_SECONDS, timezone.utc)
+            cutoffs[lane] = min(min_age_cutoff, backlog_cutoff)
+    return cutoffs
+
+
+async def _requeue_stuck(retry_queue: RetryQueue, lane: str, cutoff: datetime) -> int:
+    batch_size = settings.sweeper_batch_size
+    requeued = 0
+    after = None
+    while True:
+        async with async_session_maker() as session:
+            rows = await fetch_stuck_batch(session, cutoff, after, batch_size, lane)
+        if not rows:
+            break
+        payloads = []
+        for content_id, user_id, text_, created_at, tenant_id in rows:
+            payload = {
+                "contentId": str(content_id),
+                "text": text_,
+                "userId": user_id,
+                "lane": lane,
+                "submittedAt": created_at.timestamp() if created_at else None,
+            }
+            if tenant_id is not None:
+                payload["tenantId"] = tenant_id
+            payloads.append(payload)
+        requeued += await retry_queue.requeue(payloads)
+        after = rows[-1][0]
+        if len(rows) < batch_size:
+            break
+        # Rate cap: spread requeues so a large backlog does not flood the processor
+        await asyncio.sleep(len(rows) / settings.sweeper_max_requeue_per_second)
+    return requeued
+
+
+async def sweep_once(retry_queue: RetryQueue) -> int | None:
+    """
+    Requeue stuck PENDING content.
+
+    Returns:
+        Number of items requeued, or None if another sweeper holds the lock.
+    """
+    now = datetime.now(timezone.utc)
+    streams = LaneStreams(retry_queue.client, list(settings.priority_lane_weights), "sweeper")
+    async with engine.connect() as conn:
+        # Session-level lock on a dedicated autocommit connection: no transaction
+        # stays open while we sweep, and the lock dies with the connection.
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        locked = (
+            await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": SWEEPER_LOCK_KEY})
+        ).scalar()
+        if not locked:
+            logger.debug("Sweeper lock held elsewhere, skipping")
+            return None
+        try:
+            requeued = 0
+            for lane, cutoff in (await lane_cutoffs(streams, now)).items():
+                requeued += await _requeue_stuck(retry_queue, lane, cutoff)
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SWEEPER_LOCK_KEY})
+
+    if requeued:
+        logger.warning("Sweeper requeued %d stuck PENDING items", requeued)
+    return requeued
+
+
+async def run_sweeper(retry_queue: RetryQueue) -> None:
+    """Sweep every sweeper_interval_seconds until cancelled."""
+    while True:
+        try:
+            await sweep_once(retry_queue)
+        except Exception as e:
+            logger.exception("Sweep failed: %s", e)
+        await asyncio.sleep(settings.sweeper_interval_seconds)
+
+
+async def _main(once: bool) -> None:
+    client = redis.from_url(settings.redis_url, encoding="utf-8", decode_responses=True)
+    try:
+        retry_queue = RetryQueue(client)
+        if once:
+            requeued = await sweep_once(retry_queue)
+            logger.info("Sweep done: %s", "lock busy" if requeued is None else f"{requeued} requeued")
+        else:
+            await run_sweeper(retry_queue)
+    finally:
+        await client.close()
+        await engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Standalone sweeper entry point."""
+    parser = argparse.ArgumentParser(description="Requeue content stuck in PENDING")
+    parser.add_argument("--once", action="store_true", help="Run a single sweep and exit")
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stdout,
+    )
+    try:
+        asyncio.run(_main(args.once))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
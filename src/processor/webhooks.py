@@ -0,0 +1,208 @@
+"""Batched webhook delivery of moderation verdicts."""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+
+import httpx
+
+from src.common.config import settings
+from src.processor.retry import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# 4xx responses worth retrying; any other 4xx is a permanent failure
+RETRYABLE_CLIENT_ERRORS = (408, 429)
+
+
+@dataclass
+class WebhookEndpoint:
+    """Delivery state of one endpoint URL."""
+
+    url: str
+    queue: asyncio.Queue
+    semaphore: asyncio.Semaphore
+    task: asyncio.Task | None = None
+    in_flight: set = field(default_factory=set)
+    delivered: int = 0
+    batches: int = 0
+    failed: int = 0
+    dropped: int = 0
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize(),
+            "in_flight": len(self.in_flight),
+            "delivered": self.delivered,
+            "batches": self.batches,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+
+class WebhookDispatcher:
+    """
+    Pushes verdicts to tenants' webhook endpoints.
+
+    - submit() never blocks: each endpoint has a bounded queue and verdicts
+      that do not fit are dropped (and counted), so a slow endpoint cannot
+      stall the moderation loop.
+    - Per endpoint, queued verdicts are coalesced into POSTs of
+      {"verdicts": [...]} of up to webhook_batch_size, waiting at most
+      webhook_linger_seconds for a batch to fill.
+    - At most webhook_max_concurrency_per_endpoint POSTs are in flight per
+      endpoint, over one pooled httpx.AsyncClient shared by all endpoints.
+    - Failed POSTs (network errors, 5xx, 408, 429) are retried with
+      exponential backoff and full jitter up to webhook_max_attempts.
+    """
+
+    def __init__(
+        self,
+        subscriptions: dict[str, list[str]] | None = None,
+        client: httpx.AsyncClient | None = None,
+    ):
+        self.subscriptions = (
+            subscriptions if subscriptions is not None else settings.webhook_subscriptions
+        )
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            timeout=settings.webhook_timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=settings.webhook_max_connections,
+                max_keepalive_connections=settings.webhook_max_connections,
+            ),
+        )
+        self._endpoints: dict[str, WebhookEndpoint] = {}
+        self._closing = False
+
+    def _endpoint(self, url: str) -> WebhookEndpoint:
+        endpoint = self._endpoints.get(url)
+        if endpoint is None:
+            endpoint = WebhookEndpoint(
+                url=url,
+                queue=asyncio.Queue(settings.webhook_queue_size),
+                semaphore=asyncio.Semaphore(settings.webhook_max_concurrency_per_endpoint),
+            )
+            endpoint.task = asyncio.create_task(self._collect(endpoint))
+            self._endpoints[url] = endpoint
+        return endpoint
+
+    def submit(self, verdict: dict) -> int:
+        """
+        Queue a verdict for every endpoint of its tenantId, without blocking.
+
+        Returns:
+            Number of endpoints the verdict was queued for.
+        """
+        if self._closing:
+            return 0
+        queued = 0
+        for url in self.subscriptions.get(verdict.get("tenantId") or "", ()):
+            endpoint = self._endpoint(url)
+            try:
+                endpoint.queue.put_nowait(verdict)
+                queued += 1
+            except asyncio.QueueFull:
+                endpoint.dropped += 1
+                if endpoint.dropped == 1 or endpoint.dropped % 1000 == 0:
+                    logger.warning(
+                        "Webhook queue full for %s, %d verdicts dropped so far",
+                        url,
+                        endpoint.dropped,
+                    )
+        return queued
+
+    async def _collect(self, endpoint: WebhookEndpoint) -> None:
+        """Form batches from the endpoint's queue and hand them to delivery tasks."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await endpoint.queue.get()]
+            deadline = loop.time() + settings.webhook_linger_seconds
+            while len(batch) < settings.webhook_batch_size:
+                if not endpoint.queue.empty():
+                    batch.append(endpoint.queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0 or self._closing:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(endpoint.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await endpoint.semaphore.acquire()
+            task = asyncio.create_task(self._deliver(endpoint, batch))
+            endpoint.in_flight.add(task)
+            task.add_done_callback(endpoint.in_flight.discard)
+
+    async def _deliver(self, endpoint: WebhookEndpoint, batch: list[dict]) -> None:
+        try:
+            error = ""
+            for attempt in range(1, settings.webhook_max_attempts + 1):
+                try:
+                    response = await self.client.post(endpoint.url, json={"verdicts": batch})
+                    if response.is_success:
+                        endpoint.delivered += len(batch)
+                        endpoint.batches += 1
+                        return
+                    error = f"HTTP {response.status_code}"
+                    if (
+                        response.is_client_error
+                        and response.status_code not in RETRYABLE_CLIENT_ERRORS
+                    ):
+                        break
+                except httpx.HTTPError as e:
+                    error = str(e) or type(e).__name__
+                if attempt < settings.webhook_max_attempts:
+                    await asyncio.sleep(
+                        backoff_delay(
+                            attempt,
+                            settings.webhook_backoff_base_seconds,
+                            settings.webhook_backoff_max_seconds,
+                        )
+                    )
+            endpoint.failed += len(batch)
+            logger.error(
+                "Failed to deliver %d verdicts to %s after %d attempts: %s",
+                len(batch),
+                endpoint.url,
+                attempt,
+                error,
+            )
+        finally:
+            endpoint.semaphore.release()
+            for _ in batch:
+                endpoint.queue.task_done()
+
+    def stats(self) -> dict:
+        return {url: endpoint.stats() for url, endpoint in self._endpoints.items()}
+
+    async def close(self, timeout: float | None = None) -> bool:
+        """
+        Stop intake and deliver what is already queued, for up to timeout seconds.
+
+        Returns:
+            False if undelivered verdicts were abandoned.
+        """
+        self._closing = True
+        endpoints = list(self._endpoints.values())
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(endpoint.queue.join() for endpoint in endpoints)), timeout
+            )
+            flushed = True
+        except asyncio.TimeoutError:
+            flushed = False
+            logger.warning(
+                "Webhook flush timed out with %d verdicts queued and %d batches in flight",
+                sum(endpoint.queue.qsize() for endpoint in endpoints),
+                sum(len(endpoint.in_flight) for endpoint in endpoints),
+            )
+
+        tasks = [endpoint.task for endpoint in endpoints]
+        tasks += [task for endpoint in endpoints for task in endpoint.in_flight]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._owns_client:
+            await self.client.aclose()
+        return flushed
@@ -24,3 +24,37 @@ async def api_client():
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as client:
         yield client
+
+
+@pytest.fixture
+def db_session():
+    """Mock session injected in place of get_db."""
+    from unittest.mock import AsyncMock, MagicMock
+
+    from src.api.main import app
+    from src.api.routers.content import get_db
+
+    session = MagicMock(commit=AsyncMock())
+
+    async def override():
+        yield session
+
+    app.dependency_overrides[get_db] = override
+    yield session
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture
+def create_content():
+    """Patch the router's create_content with a fake returning the new row."""
+    import uuid
+    from unittest.mock import AsyncMock, MagicMock, patch
+
+    async def create(
+        session, user_id, text, content_id=None, status="PENDING", tenant_id=None, lane=None
+    ):
+        return MagicMock(id=content_id or uuid.uuid4(), status=status)
+
+    mock = AsyncMock(side_effect=create)
+    with patch("src.api.routers.content.create_content", mock):
+        yield mock
@@ -0,0 +1,70 @@
+"""Integration tests for the retry queue scripts (require Redis)."""
+import os
+import uuid
+
+import pytest
+import redis.asyncio as redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+
+
+@pytest.fixture
+async def queue():
+    from src.processor.retry import RetryQueue
+
+    client = redis.from_url(os.environ["REDIS_URL"], decode_responses=True)
+    try:
+        await client.ping()
+    except (RedisConnectionError, OSError) as e:
+        await client.aclose()
+        pytest.skip(f"Redis not available: {e}")
+
+    queue = RetryQueue(client)
+    prefix = f"test:{uuid.uuid4().hex}"
+    queue.retry_key, queue.retry_ids_key = f"{prefix}:retry", f"{prefix}:retry:ids"
+    queue.dead_letter_key, queue.dead_letter_ids_key = f"{prefix}:dlq", f"{prefix}:dlq:ids"
+    queue.max_attempts = 1
+    yield queue
+    await client.delete(
+        queue.retry_key, queue.retry_ids_key, queue.dead_letter_key, queue.dead_letter_ids_key
+    )
+    await client.aclose()
+
+
+@pytest.mark.integration
+async def test_dead_lettered_content_not_requeued(queue):
+    assert await queue.schedule({"contentId": "c1"}, "boom") is False
+
+    assert await queue.requeue([{"contentId": "c1", "text": "hi"}]) == 0
+    assert (await queue.stats())["retry_scheduled"] == 0
+
+
+@pytest.mark.integration
+async def test_scheduled_content_not_requeued_twice(queue):
+    assert await queue.requeue([{"contentId": "c1"}]) == 1
+    assert await queue.requeue([{"contentId": "c1", "submittedAt": 1.0}]) == 0
+
+    assert [p["contentId"] for p in await queue.claim_due()] == ["c1"]
+    assert await queue.requeue([{"contentId": "c1"}]) == 1
+
+
+@pytest.mark.integration
+async def test_replayed_dead_letter_is_scheduled_again(queue):
+    await queue.schedule({"contentId": "c1"}, "boom")
+    assert await queue.replay_dead_letters() == 1
+
+    assert await queue.requeue([{"contentId": "c1"}]) == 0
+    assert [p["contentId"] for p in await queue.claim_due()] == ["c1"]
+
+
+@pytest.mark.integration
+async def test_forget_unmarks_only_purged_dead_letters(queue):
+    await queue.schedule({"contentId": "c1"}, "boom")
+    await queue.purge_dead_letters()
+    await queue.schedule({"contentId": "c2"}, "boom")
+
+    assert await queue.forget_purged_dead_letters() == 1
+
+    assert await queue.requeue([{"contentId": "c1"}, {"contentId": "c2"}]) == 1
+    assert [p["contentId"] for p in await queue.claim_due()] == ["c1"]
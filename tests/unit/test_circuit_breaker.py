@@ -0,0 +1,112 @@
+"""Unit tests for circuit breakers and the background health monitor."""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.api.health import HealthMonitor
+from src.common.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+async def fail():
+    raise ConnectionError("down")
+
+
+async def ok():
+    return "ok"
+
+
+class TestCircuitBreaker:
+    async def test_opens_after_threshold_and_fails_fast(self):
+        breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await breaker.call(fail)
+        assert breaker.state == OPEN
+
+        called = AsyncMock()
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(called)
+        called.assert_not_awaited()
+
+    async def test_half_open_allows_single_probe(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        breaker.before_call()  # the probe
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        breaker.before_call()
+
+    async def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        with pytest.raises(ConnectionError):
+            await breaker.call(fail)
+        assert breaker.state == OPEN
+
+    async def test_non_failure_errors_count_as_success(self):
+        """Errors outside failure_types mean the dependency answered."""
+        breaker = CircuitBreaker("test", failure_threshold=1, failure_types=(ConnectionError,))
+
+        async def bad_query():
+            raise ValueError("bad input")
+
+        with pytest.raises(ValueError):
+            await breaker.call(bad_query)
+        assert breaker.state == CLOSED
+        assert await breaker.call(ok) == "ok"
+
+
+class TestHealthMonitor:
+    async def test_report_is_served_from_cache(self):
+        db_check = AsyncMock(return_value=True)
+        redis_check = AsyncMock(return_value=False)
+        with (
+            patch("src.api.health.check_db_health", db_check),
+            patch("src.api.health.check_redis_health", redis_check),
+        ):
+            monitor = HealthMonitor(interval=60)
+            first = await monitor.report()
+            second = await monitor.report()
+
+        assert first["status"] == "unhealthy"
+        assert first["database"] == "ok"
+        assert first["redis"] == "error"
+        assert second == first
+        assert db_check.await_count == 1
+
+    async def test_successful_probe_closes_circuit(self):
+        breaker = CircuitBreaker("redis", failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        with (
+            patch("src.api.health.check_db_health", AsyncMock(return_value=True)),
+            patch("src.api.health.check_redis_health", AsyncMock(return_value=True)),
+            patch("src.api.health.redis_circuit_breaker", breaker),
+        ):
+            await HealthMonitor().probe_once()
+        assert breaker.state == CLOSED
+
+
+@pytest.mark.usefixtures("db_session", "create_content")
+class TestPublishCircuit:
+    async def test_open_circuit_returns_503(self, api_client):
+        publish = AsyncMock(side_effect=CircuitOpenError("redis", 4.2))
+        with patch("src.api.routers.content.publish_content_submitted", publish):
+            r = await api_client.post("/api/v1/content/submit", json={"text": "hi", "userId": "cb-1"})
+        assert r.status_code == 503
+        assert r.headers["Retry-After"] == "4"
+
+    async def test_outbox_fallback_accepts_submission(self, api_client):
+        from src.common.config import settings
+
+        publish = AsyncMock(side_effect=CircuitOpenError("redis", 4.2))
+        with (
+            patch.object(settings, "publish_outbox_fallback", True),
+            patch("src.api.routers.content.publish_content_submitted", publish),
+        ):
+            r = await api_client.post("/api/v1/content/submit", json={"text": "hi", "userId": "cb-2"})
+        assert r.status_code == 202
@@ -0,0 +1,104 @@
+"""Unit tests for single-flight request coalescing."""
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.api.coalescing import SingleFlight
+
+
+class TestSingleFlight:
+    async def test_concurrent_calls_share_one_query(self):
+        flight = SingleFlight("test")
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "APPROVED"
+
+        results = await asyncio.gather(*(flight.do("k", fetch) for _ in range(20)))
+
+        assert results == ["APPROVED"] * 20
+        assert calls == 1
+        await asyncio.sleep(0)
+        stats = flight.stats()
+        assert stats["queries"] == 1
+        assert stats["callers"] == 20
+        assert stats["collapsed"] == 19
+        assert stats["max_fanout"] == 20
+        assert stats["in_flight"] == 0
+
+    async def test_no_caching_after_completion(self):
+        flight = SingleFlight("test")
+        fetch = AsyncMock(return_value=1)
+        await flight.do("k", fetch)
+        await flight.do("k", fetch)
+        assert fetch.await_count == 2
+
+    async def test_exception_fans_out(self):
+        flight = SingleFlight("test")
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("db down")
+
+        results = await asyncio.gather(
+            *(flight.do("k", fail) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def test_cancelled_caller_does_not_cancel_query(self):
+        flight = SingleFlight("test")
+
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        first = asyncio.create_task(flight.do("k", fetch))
+        second = asyncio.create_task(flight.do("k", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "ok"
+
+    async def test_do_many_joins_in_flight_keys(self):
+        flight = SingleFlight("test")
+        started = asyncio.Event()
+
+        async def fetch_one():
+            started.set()
+            await asyncio.sleep(0.05)
+            return "single"
+
+        fetch_many = AsyncMock(side_effect=lambda keys: {k: f"bulk-{k}" for k in keys if k != "unknown"})
+
+        single = asyncio.create_task(flight.do("a", fetch_one))
+        await started.wait()
+        results = await flight.do_many(["a", "b", "unknown", "b"], fetch_many)
+
+        assert results == {"a": "single", "b": "bulk-b", "unknown": None}
+        fetch_many.assert_awaited_once_with(["b", "unknown"])
+        assert await single == "single"
+
+
+async def test_status_endpoint_coalesces(api_client):
+    """Concurrent GET /status for one id hit the database once."""
+    import uuid
+
+    content_id = uuid.uuid4()
+
+    async def fetch(ids):
+        await asyncio.sleep(0.05)
+        return {content_id: "PENDING"}
+
+    fetch_statuses = AsyncMock(side_effect=fetch)
+    with patch("src.api.routers.content._fetch_statuses", fetch_statuses):
+        responses = await asyncio.gather(
+            *(api_client.get(f"/api/v1/content/{content_id}/status") for _ in range(10))
+        )
+        missing = await api_client.get(f"/api/v1/content/{uuid.uuid4()}/status")
+
+    assert all(r.status_code == 200 and r.json()["status"] == "PENDING" for r in responses)
+    assert missing.status_code == 404
+    assert fetch_statuses.await_count == 2
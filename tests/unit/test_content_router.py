@@ -0,0 +1,246 @@
+"""Unit tests for the content router (database and Redis mocked)."""
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.api.rate_limiter import TokenBucket
+from src.common.config import settings
+
+
+@pytest.fixture(autouse=True)
+def fresh_rate_limiter():
+    with patch("src.api.routers.content.get_rate_limiter", return_value=TokenBucket(60, 100)):
+        yield
+
+
+class TestInlineModeration:
+    async def test_small_text_moderated_inline(self, api_client, db_session, create_content):
+        publish = AsyncMock()
+        with (
+            patch.object(settings, "inline_moderation_enabled", True),
+            patch("src.api.routers.content.publish_content_submitted", publish),
+        ):
+            r = await api_client.post(
+                "/api/v1/content/submit", json={"text": "has badword", "userId": "u1"}
+            )
+
+        assert r.status_code == 200
+        assert r.json()["status"] == "REJECTED"
+        assert create_content.await_args.kwargs["status"] == "REJECTED"
+        publish.assert_not_awaited()
+
+    async def test_large_text_is_queued(self, api_client, db_session, create_content):
+        publish = AsyncMock()
+        with (
+            patch.object(settings, "inline_moderation_enabled", True),
+            patch.object(settings, "inline_moderation_max_chars", 10),
+            patch("src.api.routers.content.publish_content_submitted", publish),
+        ):
+            r = await api_client.post(
+                "/api/v1/content/submit", json={"text": "x" * 11, "userId": "u1"}
+            )
+
+        assert r.status_code == 202
+        assert set(r.json()) == {"contentId"}
+        assert create_content.await_args.kwargs["status"] == "PENDING"
+        # Stored so the sweeper requeues into the same lane
+        assert create_content.await_args.kwargs["lane"] == publish.await_args.args[3]
+        publish.assert_awaited_once()
+
+    async def test_disabled_by_default(self, api_client, db_session, create_content):
+        publish = AsyncMock()
+        with patch("src.api.routers.content.publish_content_submitted", publish):
+            r = await api_client.post("/api/v1/content/submit", json={"text": "hi", "userId": "u1"})
+
+        assert r.status_code == 202
+        publish.assert_awaited_once()
+
+
+class TestTenant:
+    @pytest.fixture(autouse=True)
+    def tenant_keys(self):
+        with patch.object(settings, "api_key_tenants", {"acme-key": "acme", "other-key": "other"}):
+            yield
+
+    async def submit(self, api_client, key: str | None, tenant: str | None = None):
+        body = {"text": "hi", "userId": "u1"}
+        if tenant is not None:
+            body["tenantId"] = tenant
+        headers = {"X-API-Key": key} if key is not None else {}
+        return await api_client.post("/api/v1/content/submit", json=body, headers=headers)
+
+    async def test_tenant_stored_and_published(self, api_client, db_session, create_content):
+        publish = AsyncMock()
+        with patch("src.api.routers.content.publish_content_submitted", publish):
+            r = await self.submit(api_client, "acme-key", "acme")
+
+        assert r.status_code == 202
+        assert create_content.await_args.kwargs["tenant_id"] == "acme"
+        assert publish.await_args.kwargs["tenant_id"] == "acme"
+
+    async def test_tenant_defaults_to_key_tenant(self, api_client, db_session, create_content):
+        with patch("src.api.routers.content.publish_content_submitted", AsyncMock()):
+            r = await self.submit(api_client, "acme-key")
+
+        assert r.status_code == 202
+        assert create_content.await_args.kwargs["tenant_id"] == "acme"
+
+    async def test_inline_verdict_forwarded_for_webhooks(
+        self, api_client, db_session, create_content
+    ):
+        forward = AsyncMock(side_effect=lambda *args: db_session.commit.assert_awaited())
+        with (
+            patch.object(settings, "inline_moderation_enabled", True),
+            patch("src.api.routers.content.publish_inline_verdict", forward),
+        ):
+            r = await self.submit(api_client, "acme-key", "acme")
+
+        assert r.status_code == 200
+        content_id, user_id, status, tenant, _ = forward.await_args.args
+        assert (str(content_id), user_id, tenant) == (r.json()["contentId"], "u1", "acme")
+        assert status == r.json()["status"]
+
+    async def test_inline_verdict_without_tenant_not_forwarded(
+        self, api_client, db_session, create_content
+    ):
+        forward = AsyncMock()
+        with (
+            patch.object(settings, "inline_moderation_enabled", True),
+            patch("src.api.routers.content.publish_inline_verdict", forward),
+        ):
+            r = await self.submit(api_client, None)
+
+        assert r.status_code == 200
+        forward.assert_not_awaited()
+
+    async def test_other_tenant_rejected(self, api_client, db_session, create_content):
+        r = await self.submit(api_client, "other-key", "acme")
+        assert r.status_code == 403
+        create_content.assert_not_awaited()
+
+    async def test_tenant_without_tenant_key_rejected(self, api_client, db_session, create_content):
+        r = await self.submit(api_client, None, "acme")
+        assert r.status_code == 403
+        create_content.assert_not_awaited()
+
+    async def test_tenant_key_passes_shared_api_key_check(
+        self, api_client, db_session, create_content
+    ):
+        with (
+            patch.object(settings, "api_key", "shared-secret"),
+            patch("src.api.routers.content.publish_content_submitted", AsyncMock()),
+        ):
+            assert (await self.submit(api_client, "acme-key")).status_code == 202
+            assert (await self.submit(api_client, "wrong-key")).status_code == 401
+
+
+class TestStatusBatch:
+    async def test_batch_reports_found_and_missing(self, api_client):
+        known, unknown = uuid.uuid4(), uuid.uuid4()
+        fetch = AsyncMock(return_value={known: "APPROVED"})
+        with patch("src.api.routers.content._fetch_statuses", fetch):
+            r = await api_client.post(
+                "/api/v1/content/status/batch",
+                json={"contentIds": [str(known), str(unknown)]},
+            )
+
+        assert r.status_code == 200
+        assert r.json() == {
+            "results": [{"contentId": str(known), "status": "APPROVED"}],
+            "notFound": [str(unknown)],
+        }
+        fetch.assert_awaited_once()
+
+    async def test_batch_size_limited(self, api_client):
+        ids = [str(uuid.uuid4()) for _ in range(101)]
+        r = await api_client.post("/api/v1/content/status/batch", json={"contentIds": ids})
+        assert r.status_code == 422
+
+
+class TestEarlyRejection:
+    async def test_rate_limited_request_opens_no_session(self, api_client):
+        limiter = MagicMock()
+        limiter.check_and_apply_rate_limit.return_value = True
+        maker = MagicMock()
+        with (
+            patch("src.api.routers.content.get_rate_limiter", return_value=limiter),
+            patch("src.common.database.async_session_maker", maker),
+        ):
+            r = await api_client.post("/api/v1/content/submit", json={"text": "hi", "userId": "u1"})
+
+        assert r.status_code == 429
+        maker.assert_not_called()
+
+    async def test_unauthorized_request_skips_rate_limit_and_db(self, api_client):
+        limiter = MagicMock()
+        maker = MagicMock()
+        with (
+            patch.object(settings, "api_key", "secret"),
+            patch("src.api.routers.content.get_rate_limiter", return_value=limiter),
+            patch("src.common.database.async_session_maker", maker),
+        ):
+            r = await api_client.post(
+                "/api/v1/content/submit",
+                json={"text": "hi", "userId": "u1"},
+                headers={"X-API-Key": "wrong"},
+            )
+
+        assert r.status_code == 401
+        limiter.check_and_apply_rate_limit.assert_not_called()
+        maker.assert_not_called()
+
+
+class TestLazySession:
+    async def test_unused_session_is_never_created(self):
+        from src.common.database import LazySession
+
+        maker = MagicMock()
+        session = LazySession(maker)
+        await session.commit()
+        await session.close()
+        assert session.opened is False
+        maker.assert_not_called()
+
+    async def test_session_created_on_first_use(self):
+        from src.common.database import LazySession
+
+        real = MagicMock(commit=AsyncMock(), close=AsyncMock())
+        session = LazySession(MagicMock(return_value=real))
+        session.add("row")
+        await session.commit()
+        await session.close()
+        real.add.assert_called_once_with("row")
+        real.commit.assert_awaited_once()
+        real.close.assert_awaited_once()
+
+
+class TestPriorityLane:
+    @pytest.fixture(autouse=True)
+    def tier_keys(self):
+        with (
+            patch.object(settings, "api_key_tenants", {"acme-key": "acme"}),
+            patch.object(settings, "api_key_tiers", {"acme-key": "premium"}),
+        ):
+            yield
+
+    async def submit_lane(self, api_client, headers: dict, priority: str | None = None) -> str:
+        body = {"text": "hi", "userId": "u1"}
+        if priority is not None:
+            body["priority"] = priority
+        publish = AsyncMock()
+        with patch("src.api.routers.content.publish_content_submitted", publish):
+            r = await api_client.post("/api/v1/content/submit", json=body, headers=headers)
+        assert r.status_code == 202
+        return publish.await_args.args[3]
+
+    async def test_tier_comes_from_api_key(self, api_client, db_session, create_content):
+        assert await self.submit_lane(api_client, {"X-API-Key": "acme-key"}) == "high"
+
+    async def test_tier_header_is_ignored(self, api_client, db_session, create_content):
+        lane = await self.submit_lane(api_client, {"X-User-Tier": "premium"})
+        assert lane == settings.default_priority_lane
+
+    async def test_priority_only_lowers_the_lane(self, api_client, db_session, create_content):
+        assert await self.submit_lane(api_client, {}, priority="high") == settings.default_priority_lane
+        assert await self.submit_lane(api_client, {"X-API-Key": "acme-key"}, priority="low") == "low"
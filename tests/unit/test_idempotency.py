@@ -0,0 +1,201 @@
+"""Unit tests for Idempotency-Key handling on submit (database and Redis mocked)."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from src.api.idempotency import (
+    IdempotencyInProgress,
+    IdempotencyKeyReused,
+    IdempotentReplay,
+    InMemoryIdempotencyStore,
+    claim_idempotency_key,
+)
+from src.api.main import app
+from src.api.rate_limiter import TokenBucket
+from src.api.routers.content import get_db
+from src.common.config import settings
+
+
+@pytest.fixture
+def store():
+    store = InMemoryIdempotencyStore()
+    with patch("src.api.routers.content.get_idempotency_store", return_value=store):
+        yield store
+
+
+@pytest.fixture
+def publish():
+    mock = AsyncMock()
+    with patch("src.api.routers.content.publish_content_submitted", mock):
+        yield mock
+
+
+@pytest.fixture
+def limiter():
+    limiter = TokenBucket(60, 100)
+    with patch("src.api.routers.content.get_rate_limiter", return_value=limiter):
+        yield limiter
+
+
+def submit(api_client, key: str | None = "key-1", text: str = "hello", user_id: str = "u1"):
+    headers = {"Idempotency-Key": key} if key is not None else {}
+    return api_client.post(
+        "/api/v1/content/submit", json={"text": text, "userId": user_id}, headers=headers
+    )
+
+
+class TestClaimIdempotencyKey:
+    async def test_first_claim_wins(self):
+        store = InMemoryIdempotencyStore()
+        claim = await claim_idempotency_key(store, "u1:k", "fp")
+        assert claim is not None
+        with pytest.raises(IdempotencyInProgress):
+            await claim_idempotency_key(store, "u1:k", "fp", timeout=0)
+
+    async def test_completed_key_replays(self):
+        store = InMemoryIdempotencyStore()
+        claim = await claim_idempotency_key(store, "u1:k", "fp")
+        await claim.complete(202, {"contentId": "abc"})
+
+        with pytest.raises(IdempotentReplay) as replay:
+            await claim_idempotency_key(store, "u1:k", "fp")
+        assert (replay.value.status_code, replay.value.body) == (202, {"contentId": "abc"})
+
+    async def test_different_body_rejected(self):
+        store = InMemoryIdempotencyStore()
+        await claim_idempotency_key(store, "u1:k", "fp")
+        with pytest.raises(IdempotencyKeyReused):
+            await claim_idempotency_key(store, "u1:k", "other", timeout=0)
+
+    async def test_duplicate_waits_for_first_request(self):
+        store = InMemoryIdempotencyStore()
+        claim = await claim_idempotency_key(store, "u1:k", "fp")
+        waiter = asyncio.create_task(claim_idempotency_key(store, "u1:k", "fp", timeout=5))
+        await asyncio.sleep(0.1)
+        assert not waiter.done()
+
+        await claim.complete(202, {"contentId": "abc"})
+        with pytest.raises(IdempotentReplay):
+            await waiter
+
+    async def test_released_key_can_be_claimed_again(self):
+        store = InMemoryIdempotencyStore()
+        claim = await claim_idempotency_key(store, "u1:k", "fp")
+        await claim.release()
+        assert await claim_idempotency_key(store, "u1:k", "fp") is not None
+
+    async def test_stale_claim_cannot_complete(self):
+        store = InMemoryIdempotencyStore()
+        claim = await claim_idempotency_key(store, "u1:k", "fp")
+        await claim.release()
+        newer = await claim_idempotency_key(store, "u1:k", "fp")
+
+        await claim.complete(202, {"contentId": "stale"})
+        record = await store.get(newer.key)
+        assert record["token"] == newer.token
+
+    async def test_store_unavailable_proceeds_without_claim(self):
+        store = MagicMock(claim=AsyncMock(side_effect=RedisConnectionError("down")))
+        assert await claim_idempotency_key(store, "u1:k", "fp") is None
+
+
+class TestSubmitIdempotency:
+    async def test_replay_skips_db_publish_and_rate_limit(
+        self, api_client, store, db_session, create_content, publish, limiter
+    ):
+        first = await submit(api_client)
+        tokens_after_first = limiter._buckets["u1"][0]
+        second = await submit(api_client)
+
+        assert first.status_code == second.status_code == 202
+        assert second.json() == first.json()
+        assert second.headers["Idempotent-Replayed"] == "true"
+        create_content.assert_awaited_once()
+        publish.assert_awaited_once()
+        assert limiter._buckets["u1"][0] == tokens_after_first
+
+    async def test_keys_scoped_per_user(self, api_client, store, db_session, create_content, publish, limiter):
+        a = await submit(api_client, user_id="u1")
+        b = await submit(api_client, user_id="u2")
+        assert a.json()["contentId"] != b.json()["contentId"]
+        assert create_content.await_count == 2
+
+    async def test_keys_scoped_per_tenant(
+        self, api_client, store, db_session, create_content, publish, limiter
+    ):
+        with patch.object(settings, "api_key_tenants", {"a": "acme", "b": "other"}):
+            acme = await api_client.post(
+                "/api/v1/content/submit",
+                json={"text": "hello", "userId": "u1"},
+                headers={"Idempotency-Key": "key-1", "X-API-Key": "a"},
+            )
+            other = await api_client.post(
+                "/api/v1/content/submit",
+                json={"text": "hello", "userId": "u1"},
+                headers={"Idempotency-Key": "key-1", "X-API-Key": "b"},
+            )
+
+        assert "Idempotent-Replayed" not in other.headers
+        assert other.json()["contentId"] != acme.json()["contentId"]
+        assert [c.kwargs["tenant_id"] for c in create_content.await_args_list] == ["acme", "other"]
+
+    async def test_failed_request_releases_key(
+        self, api_client, store, db_session, create_content, publish, limiter
+    ):
+        publish.side_effect = RuntimeError("redis down")
+        failed = await submit(api_client)
+        assert failed.status_code == 500
+
+        publish.side_effect = None
+        retried = await submit(api_client)
+        assert retried.status_code == 202
+        assert "Idempotent-Replayed" not in retried.headers
+        assert create_content.await_count == 2
+
+    async def test_failed_commit_releases_key(self, api_client, store, create_content, publish, limiter):
+        async def failing_commit():
+            yield MagicMock()
+            raise RuntimeError("commit failed")
+
+        app.dependency_overrides[get_db] = failing_commit
+        try:
+            with pytest.raises(RuntimeError):
+                await submit(api_client)
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+        assert store._records == {}
+
+    async def test_completed_record_keeps_claim_token(
+        self, api_client, store, db_session, create_content, publish, limiter
+    ):
+        await submit(api_client)
+        (record, _), = store._records.values()
+        assert record["token"]
+        assert record["statusCode"] == 202
+
+    async def test_rate_limited_request_releases_key(
+        self, api_client, store, db_session, create_content, publish
+    ):
+        limiter = MagicMock()
+        limiter.check_and_apply_rate_limit.return_value = True
+        with patch("src.api.routers.content.get_rate_limiter", return_value=limiter):
+            r = await submit(api_client)
+        assert r.status_code == 429
+        assert store._records == {}
+
+    async def test_reused_key_with_other_body(
+        self, api_client, store, db_session, create_content, publish, limiter
+    ):
+        await submit(api_client, text="hello")
+        r = await submit(api_client, text="different")
+        assert r.status_code == 422
+
+    async def test_without_key_every_request_is_new(
+        self, api_client, store, db_session, create_content, publish, limiter
+    ):
+        await submit(api_client, key=None)
+        await submit(api_client, key=None)
+        assert create_content.await_count == 2
+        assert store._records == {}
@@ -0,0 +1,146 @@
+"""Unit tests for the event-loop lag monitor and sampling profiler."""
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter
+from unittest.mock import patch
+
+import pytest
+
+from src.common.config import settings
+from src.common.instrumentation import (
+    LoopLagMonitor,
+    ProfilerBusyError,
+    SamplingProfiler,
+    dump_profile,
+    format_collapsed,
+)
+
+
+def _block_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def _spin(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestLoopLagMonitor:
+    def test_histogram_buckets(self):
+        monitor = LoopLagMonitor(interval=0.01, block_threshold=0.1)
+        for lag in (0.0005, 0.003, 0.2, 10.0):
+            monitor.record(lag)
+
+        snapshot = monitor.snapshot()
+        assert snapshot["samples"] == 4
+        assert snapshot["max_ms"] == 10000.0
+        assert snapshot["histogram"]["le_1ms"] == 1
+        assert snapshot["histogram"]["le_5ms"] == 1
+        assert snapshot["histogram"]["le_250ms"] == 1
+        assert snapshot["histogram"]["gt_5000ms"] == 1
+        assert monitor.percentile(0.5) == 5.0
+        assert monitor.percentile(0.99) is None
+
+    async def test_blocked_loop_logs_stack(self, caplog):
+        """A blocking call is measured as lag and its stack is logged by the watchdog."""
+        monitor = LoopLagMonitor(interval=0.01, block_threshold=0.05)
+        monitor.start()
+        try:
+            await asyncio.sleep(0.05)
+            with caplog.at_level(logging.WARNING, logger="src.common.instrumentation"):
+                _block_loop(0.3)
+                await asyncio.sleep(0.05)
+        finally:
+            await monitor.stop()
+
+        assert monitor.blocked == 1
+        assert monitor.max_lag >= 0.2
+        assert "_block_loop" in caplog.text
+
+    async def test_stop_ends_watchdog(self):
+        monitor = LoopLagMonitor(interval=0.01, block_threshold=0.05)
+        monitor.start()
+        watchdog = monitor._watchdog
+        await monitor.stop()
+        assert not watchdog.is_alive()
+
+
+class TestSamplingProfiler:
+    def test_samples_target_thread(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=_spin, args=(stop,), name="spinner")
+        worker.start()
+        try:
+            stacks = SamplingProfiler(interval=0.001).run(0.1, {worker.ident})
+        finally:
+            stop.set()
+            worker.join()
+
+        assert stacks
+        assert all(stack.startswith("spinner;") for stack in stacks)
+        assert any("_spin (tests.unit.test_instrumentation:" in stack for stack in stacks)
+
+    def test_idle_profiler_starts_no_thread(self):
+        before = threading.active_count()
+        profiler = SamplingProfiler()
+        assert not profiler.running
+        assert threading.active_count() == before
+
+    def test_one_profile_at_a_time(self):
+        profiler = SamplingProfiler(interval=0.001)
+        with profiler._lock:
+            with pytest.raises(ProfilerBusyError):
+                profiler.run(0.01)
+
+    def test_format_collapsed(self):
+        text = format_collapsed(Counter({"main;a;b": 3, "main;a": 1}))
+        assert text == "main;a 1\nmain;a;b 3\n"
+
+    async def test_profile_samples_loop_thread(self):
+        profiler = SamplingProfiler(interval=0.001)
+        task = asyncio.create_task(profiler.profile(0.1))
+        await asyncio.sleep(0.01)
+        _block_loop(0.05)
+        stacks = await task
+        assert any("_block_loop" in stack for stack in stacks)
+
+    async def test_dump_profile_writes_file(self, tmp_path):
+        path = await dump_profile(seconds=0.02, directory=str(tmp_path))
+        assert path is not None and path.startswith(str(tmp_path))
+        assert path.endswith(".collapsed")
+
+
+class TestAdminProfile:
+    async def test_disabled_without_admin_key(self, api_client):
+        with patch.object(settings, "admin_api_key", None):
+            r = await api_client.post("/admin/profile", params={"seconds": 0.01})
+        assert r.status_code == 404
+
+    async def test_rejects_wrong_key(self, api_client):
+        with patch.object(settings, "admin_api_key", "secret"):
+            r = await api_client.post(
+                "/admin/profile", params={"seconds": 0.01}, headers={"X-Admin-Key": "nope"}
+            )
+        assert r.status_code == 401
+
+    async def test_returns_collapsed_stacks(self, api_client):
+        with patch.object(settings, "admin_api_key", "secret"):
+            r = await api_client.post(
+                "/admin/profile", params={"seconds": 0.05}, headers={"X-Admin-Key": "secret"}
+            )
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("text/plain")
+        for line in r.text.splitlines():
+            stack, count = line.rsplit(" ", 1)
+            assert ";" in stack and int(count) > 0
+
+    async def test_seconds_capped(self, api_client):
+        with patch.object(settings, "admin_api_key", "secret"):
+            r = await api_client.post(
+                "/admin/profile",
+                params={"seconds": settings.profiler_max_seconds + 1},
+                headers={"X-Admin-Key": "secret"},
+            )
+        assert r.status_code == 422
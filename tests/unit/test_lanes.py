@@ -0,0 +1,38 @@
+"""Unit tests for priority lane resolution."""
+import pytest
+from pydantic import ValidationError
+
+from src.api.schemas import ContentSubmitRequest
+from src.common.config import settings
+from src.common.lanes import stream_for_lane, resolve_lane
+
+
+def test_priority_can_lower_the_lane():
+    assert resolve_lane("low", "premium") == "low"
+    assert resolve_lane("low") == "low"
+
+
+def test_priority_cannot_raise_the_lane():
+    assert resolve_lane("high") == settings.default_priority_lane
+    assert resolve_lane("high", "bulk") == "low"
+    assert resolve_lane("high", "premium") == "high"
+
+
+def test_user_tier_maps_to_lane():
+    assert resolve_lane(None, "premium") == "high"
+    assert resolve_lane(None, "bulk") == "low"
+
+
+def test_default_lane_for_unknown_tier():
+    assert resolve_lane(None, "unknown-tier") == settings.default_priority_lane
+    assert resolve_lane() == settings.default_priority_lane
+
+
+def test_stream_for_lane():
+    assert stream_for_lane("high") == f"{settings.moderation_events_channel}:high"
+
+
+def test_submit_request_rejects_unknown_priority():
+    with pytest.raises(ValidationError):
+        ContentSubmitRequest(text="hi", userId="u1", priority="urgent")
+    assert ContentSubmitRequest(text="hi", userId="u1", priority="high").priority == "high"
@@ -4,7 +4,7 @@ from unittest.mock import patch
 
 import pytest
 
-from src.processor.moderation import REJECT_KEYWORD, moderate_content
+from src.processor.moderation import REJECT_KEYWORD, moderate_content, moderate_inline
 
 
 class TestModerateContent:
@@ -35,3 +35,13 @@ class TestModerateContent:
         with patch("src.processor.moderation.random") as mock_random:
             mock_random.random.return_value = 0.0
             assert moderate_content("") == "APPROVED"
+
+
+class TestModerateInline:
+    """Tests for the inline fast-path helper."""
+
+    def test_small_text_gets_verdict(self):
+        assert moderate_inline("badword", max_chars=280) == "REJECTED"
+
+    def test_large_text_is_deferred(self):
+        assert moderate_inline("x" * 281, max_chars=280) is None
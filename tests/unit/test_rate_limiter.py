@@ -1,9 +1,11 @@
 """Unit tests for Token Bucket rate limiter."""
+import multiprocessing
+import os
 import time
 
 import pytest
 
-from src.api.rate_limiter import TokenBucket
+from src.api.rate_limiter import SharedMemoryTokenBucket, TokenBucket
 
 
 class TestTokenBucket:
@@ -44,3 +46,79 @@ class TestTokenBucket:
         time.sleep(1.1)  # Allow 1 token to refill
         assert limiter.check_and_apply_rate_limit("user1") is False
         assert limiter.check_and_apply_rate_limit("user1") is True
+
+
+def _consume_shared(path: str, attempts: int, results) -> None:
+    limiter = SharedMemoryTokenBucket(tokens_per_minute=1, capacity=50, path=path, slots=64)
+    results.put(sum(not limiter.check_and_apply_rate_limit("shared-user") for _ in range(attempts)))
+
+
+class TestSharedMemoryTokenBucket:
+    """Tests for the shared-memory rate limiter backend."""
+
+    @pytest.fixture
+    def shm_path(self, tmp_path):
+        return str(tmp_path / "rate-limit")
+
+    def test_rate_limits_after_capacity_exhausted(self, shm_path):
+        limiter = SharedMemoryTokenBucket(tokens_per_minute=60, capacity=3, path=shm_path)
+        for _ in range(3):
+            assert limiter.check_and_apply_rate_limit("user1") is False
+        assert limiter.check_and_apply_rate_limit("user1") is True
+        assert limiter.check_and_apply_rate_limit("user2") is False
+
+    def test_tokens_refill_over_time(self, shm_path):
+        limiter = SharedMemoryTokenBucket(tokens_per_minute=60, capacity=1, path=shm_path)
+        assert limiter.check_and_apply_rate_limit("user1") is False
+        assert limiter.check_and_apply_rate_limit("user1") is True
+        time.sleep(1.1)
+        assert limiter.check_and_apply_rate_limit("user1") is False
+
+    def test_instances_share_state(self, shm_path):
+        """Two limiters on the same file (e.g. two workers) enforce one limit."""
+        first = SharedMemoryTokenBucket(tokens_per_minute=60, capacity=2, path=shm_path)
+        second = SharedMemoryTokenBucket(tokens_per_minute=60, capacity=2, path=shm_path)
+        assert first.check_and_apply_rate_limit("user1") is False
+        assert second.check_and_apply_rate_limit("user1") is False
+        assert first.check_and_apply_rate_limit("user1") is True
+        assert second.check_and_apply_rate_limit("user1") is True
+
+    def test_full_table_evicts_without_error(self, shm_path):
+        """A table smaller than the user count keeps working by reusing slots."""
+        limiter = SharedMemoryTokenBucket(tokens_per_minute=60, capacity=1, path=shm_path, slots=8)
+        for i in range(100):
+            assert limiter.check_and_apply_rate_limit(f"user{i}") is False
+
+    def test_new_layout_replaces_table_without_truncating_mapped_file(self, shm_path):
+        """A process still mapping the old table keeps working (no SIGBUS)."""
+        old = SharedMemoryTokenBucket(tokens_per_minute=60, capacity=1, path=shm_path, slots=64)
+        old_size = os.path.getsize(shm_path)
+
+        new = SharedMemoryTokenBucket(tokens_per_minute=60, capacity=1, path=shm_path, slots=8)
+
+        assert os.path.getsize(shm_path) < old_size
+        assert os.fstat(old._fd).st_size == old_size  # old inode untouched
+        for i in range(64):
+            old.check_and_apply_rate_limit(f"user{i}")  # touches every old bucket
+        assert new.check_and_apply_rate_limit("user0") is False
+        assert not [name for name in os.listdir(os.path.dirname(shm_path)) if name.endswith(".tmp")]
+        old.close()
+        new.close()
+
+    def test_same_layout_reuses_table(self, shm_path):
+        first = SharedMemoryTokenBucket(tokens_per_minute=60, capacity=1, path=shm_path)
+        second = SharedMemoryTokenBucket(tokens_per_minute=60, capacity=1, path=shm_path)
+        assert os.fstat(first._fd).st_ino == os.fstat(second._fd).st_ino
+        first.close()
+        second.close()
+
+    def test_limit_enforced_across_processes(self, shm_path):
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        procs = [ctx.Process(target=_consume_shared, args=(shm_path, 40, results)) for _ in range(4)]
+        for proc in procs:
+            proc.start()
+        allowed = sum(results.get(timeout=30) for _ in procs)
+        for proc in procs:
+            proc.join()
+        assert allowed == 50
@@ -23,3 +23,18 @@ async def test_create_content_returns_content_with_id():
     assert content.text == "Hello world"
     assert content.id is not None
     assert session.add.call_count >= 2  # Content + ModerationResult
+
+
+@pytest.mark.asyncio
+async def test_create_content_with_inline_verdict():
+    """An inline verdict is stored directly with moderated_at set."""
+    session = AsyncMock(spec=AsyncSession)
+    session.add = MagicMock()
+    session.flush = AsyncMock()
+
+    await create_content(session, "user1", "Hello", status="APPROVED")
+
+    result = session.add.call_args_list[-1].args[0]
+    assert isinstance(result, ModerationResult)
+    assert result.status == "APPROVED"
+    assert result.moderated_at is not None
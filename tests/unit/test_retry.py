@@ -0,0 +1,153 @@
+"""Unit tests for the retry scheduler and dead-letter queue."""
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.processor.consumer import _dispatch, _poll_retries, process_message
+from src.processor.retry import RetryQueue, backoff_delay
+from src.processor.scheduler import WeightedFairScheduler
+
+
+def make_queue(max_attempts: int = 3) -> tuple[RetryQueue, MagicMock]:
+    """Queue on a mocked client; returns the MULTI pipeline that schedule() writes to."""
+    client = MagicMock()
+    pipe = MagicMock(execute=AsyncMock())
+    client.pipeline.return_value.__aenter__.return_value = pipe
+    client.register_script = MagicMock(side_effect=lambda script: AsyncMock())
+    queue = RetryQueue(client)
+    queue.max_attempts = max_attempts
+    return queue, pipe
+
+
+class TestBackoffDelay:
+    def test_delay_within_exponential_bound(self):
+        for attempts, bound in [(1, 1.0), (2, 2.0), (4, 8.0)]:
+            for _ in range(20):
+                assert 0 <= backoff_delay(attempts, base=1.0, cap=100.0) <= bound
+
+    def test_delay_capped(self):
+        for _ in range(20):
+            assert backoff_delay(30, base=1.0, cap=5.0) <= 5.0
+
+
+class TestRetryQueue:
+    async def test_schedule_adds_to_sorted_set(self):
+        queue, pipe = make_queue()
+        assert await queue.schedule({"contentId": "c1"}, RuntimeError("db down")) is True
+
+        pipe.zadd.assert_called_once()
+        key, mapping = pipe.zadd.call_args.args
+        member = json.loads(next(iter(mapping)))
+        assert key == queue.retry_key
+        assert member["attempts"] == 1
+        assert member["lastError"] == "db down"
+        pipe.lpush.assert_not_called()
+
+    async def test_dead_letters_after_max_attempts(self):
+        queue, pipe = make_queue(max_attempts=3)
+        assert await queue.schedule({"contentId": "c1", "attempts": 2}, "boom") is False
+
+        pipe.zadd.assert_not_called()
+        key, raw = pipe.lpush.call_args.args
+        entry = json.loads(raw)
+        assert key == queue.dead_letter_key
+        assert entry["attempts"] == 3
+        assert "deadLetteredAt" in entry
+        pipe.sadd.assert_called_once_with(queue.dead_letter_ids_key, "c1")
+        pipe.execute.assert_awaited_once()
+
+    async def test_scheduled_retry_marks_content_id_in_same_transaction(self):
+        queue, pipe = make_queue()
+        await queue.schedule({"contentId": "c1"}, "boom")
+        pipe.sadd.assert_called_once_with(queue.retry_ids_key, "c1")
+        pipe.execute.assert_awaited_once()
+        assert queue.client.pipeline.call_args.kwargs == {"transaction": True}
+
+    async def test_forget_purged_dead_letters(self):
+        queue, _ = make_queue()
+        queue._forget_purged.return_value = 2
+        assert await queue.forget_purged_dead_letters() == 2
+        assert queue._forget_purged.await_args.kwargs["keys"] == [
+            queue.dead_letter_key,
+            queue.dead_letter_ids_key,
+        ]
+
+    async def test_requeue_checks_scheduled_and_dead_lettered_ids(self):
+        queue, _ = make_queue()
+        queue._requeue.return_value = 1
+        assert await queue.requeue([{"contentId": "c1"}, {"contentId": "c2"}]) == 1
+
+        kwargs = queue._requeue.await_args.kwargs
+        assert kwargs["keys"] == [queue.retry_key, queue.retry_ids_key, queue.dead_letter_ids_key]
+        assert [json.loads(a)["contentId"] for a in kwargs["args"][1:]] == ["c1", "c2"]
+
+    async def test_claim_due_decodes_members(self):
+        queue, _ = make_queue()
+        queue._claim_due.return_value = [json.dumps({"contentId": "c1"}), "not-json"]
+        assert await queue.claim_due(10) == [{"contentId": "c1"}]
+
+
+class TestDispatchRetries:
+    async def test_failed_message_is_scheduled_for_retry(self):
+        scheduler = WeightedFairScheduler({"normal": 1})
+        retry_queue = MagicMock()
+        retry_queue.schedule = AsyncMock()
+        scheduler.put("normal", ({"contentId": "c1"}, None))
+
+        with patch(
+            "src.processor.consumer.process_message",
+            AsyncMock(side_effect=RuntimeError("db down")),
+        ):
+            task = asyncio.create_task(_dispatch(scheduler, asyncio.Event(), retry_queue))
+            await asyncio.sleep(0.05)
+            task.cancel()
+
+        retry_queue.schedule.assert_awaited_once()
+        assert retry_queue.schedule.await_args.args[0] == {"contentId": "c1"}
+
+    async def test_failed_batch_is_retried_not_remoderated(self):
+        scheduler = WeightedFairScheduler({"normal": 1})
+        retry_queue = MagicMock(schedule=AsyncMock())
+        scheduler.put("normal", ({"contentId": "c1"}, None))
+        scheduler.put("normal", ({"contentId": "c2"}, None))
+        process = AsyncMock()
+
+        with (
+            patch("src.processor.consumer.moderate_batch", side_effect=OSError("no model")),
+            patch("src.processor.consumer.process_message", process),
+        ):
+            task = asyncio.create_task(_dispatch(scheduler, asyncio.Event(), retry_queue))
+            await asyncio.sleep(0.05)
+            task.cancel()
+
+        process.assert_not_awaited()
+        assert [c.args[0]["contentId"] for c in retry_queue.schedule.await_args_list] == ["c1", "c2"]
+
+    async def test_retries_for_full_lane_are_requeued(self):
+        scheduler = WeightedFairScheduler({"normal": 1}, max_depth=1)
+        retry_queue = MagicMock()
+        retry_queue.claim_due = AsyncMock(side_effect=[[{"contentId": "c1"}, {"contentId": "c2"}], []])
+        retry_queue.requeue = AsyncMock()
+
+        task = asyncio.create_task(_poll_retries(retry_queue, scheduler))
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        assert scheduler.get_nowait() == ("normal", ({"contentId": "c1"}, None))
+        retry_queue.requeue.assert_awaited_once_with([{"contentId": "c2"}])
+
+
+async def test_update_is_conditional_on_pending():
+    """Replays of already-moderated content must not overwrite the verdict."""
+    session = AsyncMock()
+    session.execute.return_value = MagicMock(rowcount=0)
+    maker = MagicMock()
+    maker.return_value.__aenter__.return_value = session
+
+    with patch("src.processor.consumer.async_session_maker", maker):
+        await process_message({"contentId": "550e8400-e29b-41d4-a716-446655440000", "text": "hi"})
+
+    stmt = session.execute.await_args.args[0]
+    assert "moderation_results.status = :status_1" in str(stmt)
@@ -0,0 +1,97 @@
+"""Unit tests for weighted fair lane scheduling."""
+import asyncio
+import time
+from collections import Counter
+
+import pytest
+
+from src.processor.scheduler import WeightedFairScheduler
+
+
+class TestWeightedFairScheduler:
+    """Tests for WeightedFairScheduler."""
+
+    def test_dispatch_share_follows_weights(self):
+        """With all lanes backlogged, dispatches are proportional to weight."""
+        scheduler = WeightedFairScheduler({"high": 5, "normal": 3, "low": 1})
+        for lane in scheduler.lanes:
+            for i in range(100):
+                scheduler.put(lane, i)
+
+        counts = Counter(scheduler.get_nowait()[0] for _ in range(90))
+        assert counts == {"high": 50, "normal": 30, "low": 10}
+
+    def test_low_lane_not_starved(self):
+        """A low-weight lane is served at least once per round."""
+        scheduler = WeightedFairScheduler({"high": 5, "low": 1})
+        for i in range(50):
+            scheduler.put("high", i)
+        scheduler.put("low", "backfill")
+
+        first_round = [scheduler.get_nowait()[0] for _ in range(6)]
+        assert "low" in first_round
+
+    def test_fifo_within_lane(self):
+        """Items keep submission order inside a lane."""
+        scheduler = WeightedFairScheduler({"normal": 1})
+        for i in range(3):
+            scheduler.put("normal", i)
+        assert [scheduler.get_nowait()[1] for _ in range(3)] == [0, 1, 2]
+
+    def test_empty_lanes_skipped(self):
+        """A lone low lane is dispatched without waiting on empty lanes."""
+        scheduler = WeightedFairScheduler({"high": 5, "low": 1})
+        scheduler.put("low", "a")
+        scheduler.put("low", "b")
+        assert scheduler.get_nowait() == ("low", "a")
+        assert scheduler.get_nowait() == ("low", "b")
+        with pytest.raises(asyncio.QueueEmpty):
+            scheduler.get_nowait()
+
+    def test_unknown_lane_rejected(self):
+        scheduler = WeightedFairScheduler({"normal": 1})
+        with pytest.raises(KeyError):
+            scheduler.put("urgent", "x")
+
+    def test_invalid_weights(self):
+        with pytest.raises(ValueError):
+            WeightedFairScheduler({"normal": 0})
+
+    def test_lag_metrics_per_lane(self):
+        """Lag is measured from submittedAt to dispatch."""
+        scheduler = WeightedFairScheduler({"high": 2, "low": 1})
+        scheduler.put("low", "x", submitted_at=time.time() - 5)
+        scheduler.get_nowait()
+
+        snapshot = scheduler.snapshot()
+        assert snapshot["low"]["dispatched"] == 1
+        assert snapshot["low"]["lag_max"] >= 5
+        assert snapshot["high"]["dispatched"] == 0
+        assert snapshot["high"]["depth"] == 0
+
+    async def test_get_waits_for_item(self):
+        """get() blocks until an item is enqueued."""
+        scheduler = WeightedFairScheduler({"normal": 1})
+        waiter = asyncio.create_task(scheduler.get())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        scheduler.put("normal", "payload")
+        assert await asyncio.wait_for(waiter, timeout=1) == ("normal", "payload")
+
+    def test_full_lane_drops_and_counts(self):
+        """Items beyond max_depth are rejected without affecting other lanes."""
+        scheduler = WeightedFairScheduler({"high": 1, "low": 1}, max_depth=2)
+        assert scheduler.put("low", "a")
+        assert scheduler.put("low", "b")
+        assert not scheduler.put("low", "c")
+        assert scheduler.put("high", "x")
+
+        snapshot = scheduler.snapshot()
+        assert snapshot["low"]["depth"] == 2
+        assert snapshot["low"]["dropped"] == 1
+        assert snapshot["high"]["dropped"] == 0
+
+        scheduler.get_nowait()
+        scheduler.get_nowait()
+        assert scheduler.put("low", "d")
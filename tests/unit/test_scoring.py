@@ -0,0 +1,89 @@
+"""Unit tests for the hashed n-gram scoring model."""
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.common.config import settings
+from src.processor import scoring
+from src.processor.moderation import load_engine, moderate_batch, moderate_inline
+from src.processor.scoring import HashedNgramModel
+
+
+@pytest.fixture
+def model():
+    return HashedNgramModel.from_keywords({"badword": 10.0}, bits=16)
+
+
+class TestHashedNgramModel:
+    def test_keyword_model_classifies(self, model):
+        assert model.classify(["hello world", "this has BadWord in it", ""]) == [
+            "APPROVED",
+            "REJECTED",
+            "APPROVED",
+        ]
+
+    def test_batch_scores_match_single_scores(self, model):
+        """Features never span two texts, so batching does not change scores."""
+        rng = np.random.default_rng(0)
+        model.weights[:] = rng.normal(size=model.weights.shape).astype(np.float32)
+        texts = ["short", "badword here", "ünïcödé text", "a", "x" * 300, "two words"]
+
+        batch = model.score(texts)
+        single = np.array([model.score([t])[0] for t in texts])
+        np.testing.assert_allclose(batch, single)
+
+    def test_hashing_is_deterministic(self, model):
+        other = HashedNgramModel.from_keywords({"badword": 10.0}, bits=16)
+        rows_a, idx_a = model.featurize(["Deterministic hashing"])
+        rows_b, idx_b = other.featurize(["Deterministic hashing"])
+        np.testing.assert_array_equal(idx_a, idx_b)
+
+    def test_feature_counts(self, model):
+        """3..5-char n-grams of the padded text plus word unigrams and bigrams."""
+        rows, indices = model.featurize(["ab cd"])  # padded: " ab cd " (7 bytes)
+        assert len(indices) == (5 + 4 + 3) + 2 + 1
+        assert indices.max() < 2**16
+
+    def test_save_and_load_memory_mapped(self, model, tmp_path):
+        path = str(tmp_path / "model.bin")
+        model.save(path)
+
+        loaded = HashedNgramModel.load(path)
+        assert isinstance(loaded.weights, np.memmap)
+        assert loaded.bits == 16
+        assert loaded.bias == model.bias
+        assert loaded.classify(["badword"]) == ["REJECTED"]
+
+    def test_load_rejects_other_files(self, tmp_path):
+        path = tmp_path / "junk.bin"
+        path.write_bytes(b"\0" * 128)
+        with pytest.raises(ValueError):
+            HashedNgramModel.load(str(path))
+
+
+class TestEngineSelection:
+    def test_moderate_batch_uses_ngram_engine(self, model):
+        with (
+            patch.object(settings, "moderation_engine", "ngram"),
+            patch("src.processor.scoring.get_scoring_model", return_value=model),
+        ):
+            assert moderate_batch(["fine", "badword"]) == ["APPROVED", "REJECTED"]
+
+    def test_inline_defers_ambiguous_scores(self, model):
+        model.bias = 0.0  # probability 0.5 for texts without the keyword
+        with (
+            patch.object(settings, "moderation_engine", "ngram"),
+            patch("src.processor.scoring.get_scoring_model", return_value=model),
+        ):
+            assert moderate_inline("neutral text", max_chars=280) is None
+            assert moderate_inline("badword", max_chars=280) == "REJECTED"
+
+    def test_unloadable_model_fails_at_startup(self):
+        with (
+            patch.object(settings, "moderation_engine", "ngram"),
+            patch.object(settings, "moderation_model_path", "/nonexistent.bin"),
+            patch.object(scoring, "_model", None),
+        ):
+            with pytest.raises(OSError):
+                load_engine()
@@ -0,0 +1,200 @@
+"""Unit tests for the lane stream consumer group (Redis mocked)."""
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from redis.exceptions import ResponseError
+
+from src.common.config import settings
+from src.common.lanes import stream_for_lane
+from src.processor.consumer import _claim_stale, _dispatch, _read_lanes
+from src.processor.scheduler import WeightedFairScheduler
+from src.processor.streams import LaneStreams
+
+
+def entry(entry_id: str, payload) -> tuple[str, dict]:
+    return entry_id, {"data": json.dumps(payload)}
+
+
+def streams_for(lanes: list[str]) -> LaneStreams:
+    client = MagicMock()
+    client.xgroup_create = AsyncMock()
+    client.xreadgroup = AsyncMock(return_value=[])
+    client.xautoclaim = AsyncMock(return_value=["0-0", [], []])
+    client.xack = AsyncMock()
+    return LaneStreams(client, lanes, "host-0")
+
+
+async def run_briefly(coro, seconds: float = 0.05) -> None:
+    task = asyncio.create_task(coro)
+    await asyncio.sleep(seconds)
+    task.cancel()
+
+
+class TestLaneStreams:
+    async def test_existing_group_is_kept(self):
+        streams = streams_for(["high", "low"])
+        streams.client.xgroup_create.side_effect = [None, ResponseError("BUSYGROUP exists")]
+        await streams.ensure_groups()
+        assert streams.client.xgroup_create.await_count == 2
+
+    async def test_read_skips_full_lanes(self):
+        streams = streams_for(["high", "low"])
+        streams.client.xreadgroup.return_value = [
+            [stream_for_lane("high"), [entry("1-0", {"contentId": "c1"})]]
+        ]
+
+        entries = await streams.read({"high": 5, "low": 0})
+
+        assert entries == [("high", "1-0", {"contentId": "c1"})]
+        streams.client.xreadgroup.assert_awaited_once()
+        assert streams.client.xreadgroup.await_args.args[2] == {stream_for_lane("high"): ">"}
+        assert streams.client.xreadgroup.await_args.kwargs["count"] == 5
+
+    async def test_each_lane_read_with_its_own_count(self):
+        """A nearly full low lane does not throttle high."""
+        streams = streams_for(["high", "low"])
+        streams.client.xreadgroup.side_effect = [
+            [[stream_for_lane("high"), [entry("1-0", {"contentId": "c1"})]]],
+            [[stream_for_lane("low"), [entry("2-0", {"contentId": "c2"})]]],
+        ]
+
+        entries = await streams.read({"high": None, "low": 1})
+
+        assert [e[0] for e in entries] == ["high", "low"]
+        counts = [call.kwargs["count"] for call in streams.client.xreadgroup.await_args_list]
+        assert counts == [settings.stream_read_count, 1]
+        assert all("block" not in call.kwargs for call in streams.client.xreadgroup.await_args_list)
+
+    async def test_blocks_on_all_lanes_only_when_none_has_entries(self):
+        streams = streams_for(["high", "low"])
+        streams.client.xreadgroup.side_effect = [
+            [],
+            [],
+            [[stream_for_lane("low"), [entry("2-0", {"contentId": "c2"})]]],
+        ]
+
+        entries = await streams.read({"high": None, "low": 1}, block=0.5)
+
+        assert entries == [("low", "2-0", {"contentId": "c2"})]
+        blocking = streams.client.xreadgroup.await_args_list[-1]
+        assert blocking.args[2] == {stream_for_lane("high"): ">", stream_for_lane("low"): ">"}
+        assert blocking.kwargs["block"] == 500
+
+    async def test_nothing_read_when_all_lanes_full(self):
+        streams = streams_for(["high"])
+        assert await streams.read({"high": 0}) == []
+        streams.client.xreadgroup.assert_not_awaited()
+
+    async def test_oldest_unacked_prefers_pending_entries(self):
+        streams = streams_for(["normal"])
+        streams.client.xinfo_groups = AsyncMock(
+            return_value=[{"name": settings.processor_consumer_group, "last-delivered-id": "9000-0"}]
+        )
+        streams.client.xpending = AsyncMock(return_value={"pending": 2, "min": "5000-1"})
+        assert await streams.oldest_unacked("normal") == 5.0
+
+    async def test_oldest_unacked_falls_back_to_first_undelivered_entry(self):
+        streams = streams_for(["normal"])
+        streams.client.xinfo_groups = AsyncMock(
+            return_value=[{"name": settings.processor_consumer_group, "last-delivered-id": "9000-0"}]
+        )
+        streams.client.xpending = AsyncMock(return_value={"pending": 0})
+        streams.client.xrange = AsyncMock(return_value=[entry("12000-0", {})])
+
+        assert await streams.oldest_unacked("normal") == 12.0
+        assert streams.client.xrange.await_args.kwargs["min"] == "(9000-0"
+
+    async def test_oldest_unacked_none_when_caught_up(self):
+        streams = streams_for(["normal"])
+        streams.client.xinfo_groups = AsyncMock(side_effect=ResponseError("no such key"))
+        assert await streams.oldest_unacked("normal") is None
+
+    async def test_claim_stale_skips_trimmed_entries_and_advances_cursor(self):
+        streams = streams_for(["normal"])
+        streams.client.xautoclaim.return_value = [
+            "7-0",
+            [entry("3-0", {"contentId": "c3"}), ("4-0", None)],
+            [],
+        ]
+
+        entries = await streams.claim_stale("normal", 10)
+
+        assert entries == [("normal", "3-0", {"contentId": "c3"})]
+        assert streams._claim_cursors["normal"] == "7-0"
+        kwargs = streams.client.xautoclaim.await_args.kwargs
+        assert kwargs["min_idle_time"] == int(settings.stream_claim_idle_seconds * 1000)
+
+
+class TestConsumerGroupIntake:
+    def test_default_lane_buffer_is_a_few_reads(self):
+        """Buffered entries are pending; a deep buffer outlives the claim idle time."""
+        assert settings.lane_max_buffered_events <= 5 * settings.stream_read_count
+
+    async def test_entries_buffered_with_their_ids(self):
+        scheduler = WeightedFairScheduler({"normal": 1}, max_depth=10)
+        streams = streams_for(["normal"])
+        streams.client.xreadgroup.side_effect = [
+            [[stream_for_lane("normal"), [entry("1-0", {"contentId": "c1"})]]],
+        ] + [[]] * 100
+
+        await run_briefly(_read_lanes(streams, scheduler))
+
+        assert scheduler.get_nowait() == ("normal", ({"contentId": "c1"}, "1-0"))
+
+    async def test_invalid_entries_acked_and_dropped(self):
+        scheduler = WeightedFairScheduler({"normal": 1})
+        streams = streams_for(["normal"])
+        streams.client.xreadgroup.side_effect = [
+            [[stream_for_lane("normal"), [("1-0", {"data": "not-json"}), entry("2-0", [1])]]],
+        ] + [[]] * 100
+
+        await run_briefly(_read_lanes(streams, scheduler))
+
+        assert scheduler.qsize() == 0
+        assert streams.client.xack.await_count == 2
+
+    async def test_full_lane_is_not_read(self):
+        scheduler = WeightedFairScheduler({"normal": 1}, max_depth=1)
+        scheduler.put("normal", ({"contentId": "c0"}, "0-1"))
+        streams = streams_for(["normal"])
+
+        await run_briefly(_read_lanes(streams, scheduler))
+
+        streams.client.xreadgroup.assert_not_awaited()
+
+    async def test_stale_entries_claimed_into_lanes(self):
+        scheduler = WeightedFairScheduler({"normal": 1}, max_depth=10)
+        streams = streams_for(["normal"])
+        streams.client.xautoclaim.return_value = ["0-0", [entry("5-0", {"contentId": "c5"})], []]
+
+        await run_briefly(_claim_stale(streams, scheduler))
+
+        assert scheduler.get_nowait() == ("normal", ({"contentId": "c5"}, "5-0"))
+
+
+class TestDispatchAcks:
+    async def run_dispatch(self, process: AsyncMock, retry_queue: MagicMock) -> LaneStreams:
+        scheduler = WeightedFairScheduler({"normal": 1})
+        streams = streams_for(["normal"])
+        scheduler.put("normal", ({"contentId": "c1"}, "1-0"))
+        scheduler.put("normal", ({"contentId": "c2"}, None))
+        with patch("src.processor.consumer.process_message", process):
+            await run_briefly(_dispatch(scheduler, asyncio.Event(), retry_queue, None, streams))
+        return streams
+
+    async def test_processed_entries_acked(self):
+        streams = await self.run_dispatch(AsyncMock(return_value="APPROVED"), MagicMock())
+        streams.client.xack.assert_awaited_once_with(
+            stream_for_lane("normal"), settings.processor_consumer_group, "1-0"
+        )
+
+    async def test_entry_acked_once_retry_is_scheduled(self):
+        retry_queue = MagicMock(schedule=AsyncMock())
+        streams = await self.run_dispatch(AsyncMock(side_effect=RuntimeError("db down")), retry_queue)
+        streams.client.xack.assert_awaited_once()
+
+    async def test_entry_stays_pending_if_retry_cannot_be_scheduled(self):
+        retry_queue = MagicMock(schedule=AsyncMock(side_effect=RuntimeError("redis down")))
+        streams = await self.run_dispatch(AsyncMock(side_effect=RuntimeError("db down")), retry_queue)
+        streams.client.xack.assert_not_awaited()
@@ -0,0 +1,114 @@
+"""Unit tests for the processor supervisor and graceful drain."""
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.processor import consumer
+from src.processor.consumer import _drain
+from src.processor.scheduler import WeightedFairScheduler
+from src.processor.supervisor import Supervisor, restart_delay
+
+
+def crashing_worker(index, count, heartbeats):
+    """Worker that exits immediately with an error."""
+    raise SystemExit(3)
+
+
+def sleeping_worker(index, count, heartbeats):
+    """Worker that runs until terminated."""
+    while True:
+        heartbeats[index] = time.time()
+        time.sleep(0.05)
+
+
+class TestRestartDelay:
+    def test_exponential_backoff_capped(self):
+        assert restart_delay(0, cap=10) == 0.0
+        assert restart_delay(1, cap=10) == 0.5
+        assert restart_delay(3, cap=10) == 2.0
+        assert restart_delay(20, cap=10) == 10
+
+
+class TestDrain:
+    async def test_drain_waits_for_buffered_events(self):
+        scheduler = WeightedFairScheduler({"normal": 1})
+        idle = asyncio.Event()
+        idle.set()
+        scheduler.put("normal", {"contentId": "a"})
+
+        async def consume():
+            await asyncio.sleep(0.1)
+            scheduler.get_nowait()
+
+        asyncio.create_task(consume())
+        assert await _drain(scheduler, idle, timeout=2) is True
+        assert scheduler.qsize() == 0
+
+    async def test_drain_times_out_when_busy(self):
+        scheduler = WeightedFairScheduler({"normal": 1})
+        idle = asyncio.Event()  # never idle
+        assert await _drain(scheduler, idle, timeout=0.1) is False
+
+
+    async def test_drain_and_webhook_flush_share_one_budget(self):
+        async def forever(*args):
+            await asyncio.Event().wait()
+
+        async def slow_drain(scheduler, idle, timeout):
+            await asyncio.sleep(0.3)
+            return False
+
+        webhooks = MagicMock(close=AsyncMock())
+        streams = MagicMock(ensure_groups=AsyncMock(), streams={})
+        stop = asyncio.Event()
+        stop.set()
+        with (
+            patch.object(consumer, "load_engine"),
+            patch.object(consumer.redis, "from_url", MagicMock(return_value=MagicMock(close=AsyncMock()))),
+            patch.object(consumer, "LaneStreams", MagicMock(return_value=streams)),
+            patch.object(consumer, "WebhookDispatcher", MagicMock(return_value=webhooks)),
+            patch.object(consumer, "get_loop_monitor", MagicMock(return_value=AsyncMock(start=MagicMock()))),
+            patch.object(consumer, "_read_lanes", forever),
+            patch.object(consumer, "_claim_stale", forever),
+            patch.object(consumer, "_poll_retries", forever),
+            patch.object(consumer, "_dispatch", forever),
+            patch.object(consumer, "_log_lane_metrics", forever),
+            patch.object(consumer, "_drain", slow_drain),
+            patch.object(consumer.settings, "sweeper_enabled", False),
+            patch.object(consumer.settings, "webhook_subscriptions", {"acme": ["http://hook"]}),
+            patch.object(consumer.settings, "processor_drain_timeout_seconds", 1.0),
+        ):
+            await consumer.run_consumer(stop=stop)
+
+        # The flush only gets what the drain left of the drain timeout
+        assert webhooks.close.await_args.args[0] <= 0.75
+
+
+class TestSupervisor:
+    def test_restarts_crashed_workers(self):
+        supervisor = Supervisor(workers=1, target=crashing_worker, drain_timeout=1)
+        supervisor.start()
+        try:
+            deadline = time.monotonic() + 10
+            while supervisor.health()["workers"][0]["restarts"] < 2 and time.monotonic() < deadline:
+                time.sleep(0.1)
+                supervisor.check_workers()
+            worker = supervisor.health()["workers"][0]
+            assert worker["restarts"] >= 2
+            assert worker["last_exitcode"] == 3
+        finally:
+            supervisor.stop()
+
+    def test_stop_terminates_workers_and_reports_health(self):
+        supervisor = Supervisor(workers=2, target=sleeping_worker, drain_timeout=2)
+        supervisor.start()
+        try:
+            time.sleep(0.2)
+            report = supervisor.health()
+            assert report["status"] == "healthy"
+            assert report["workers_healthy"] == 2
+        finally:
+            supervisor.stop()
+        assert supervisor.health()["workers_healthy"] == 0
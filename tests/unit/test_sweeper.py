@@ -0,0 +1,135 @@
+"""Unit tests for the PENDING reconciliation sweeper."""
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.common.models import ModerationResult
+from src.processor import sweeper
+from src.processor.sweeper import fetch_stuck_batch, lane_cutoffs, sweep_once
+
+
+def mock_lock_engine(locked: bool) -> tuple[MagicMock, AsyncMock]:
+    conn = AsyncMock()
+    conn.execution_options = AsyncMock(return_value=conn)
+    conn.execute.return_value = MagicMock(scalar=MagicMock(return_value=locked))
+    engine = MagicMock()
+    engine.connect.return_value.__aenter__.return_value = conn
+    return engine, conn
+
+
+def mock_streams(oldest: dict[str, float | None]) -> MagicMock:
+    streams = MagicMock(streams={lane: f"stream:{lane}" for lane in oldest})
+    streams.oldest_unacked = AsyncMock(side_effect=oldest.get)
+    return streams
+
+
+def test_pending_partial_index_declared():
+    index = next(i for i in ModerationResult.__table__.indexes if i.name == "idx_moderation_results_pending")
+    assert str(index.dialect_options["postgresql"]["where"]) == "status = 'PENDING'"
+
+
+async def test_fetch_stuck_batch_filters_pending_and_age():
+    session = AsyncMock()
+    session.execute.return_value = MagicMock(all=MagicMock(return_value=[]))
+    cutoff = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    await fetch_stuck_batch(session, cutoff, uuid.uuid4(), 50)
+
+    sql = str(session.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "moderation_results.status = " in sql
+    assert "content.created_at < " in sql
+    assert "moderation_results.content_id > " in sql
+    assert "ORDER BY moderation_results.content_id" in sql
+    assert "content.lane" not in sql
+
+
+async def test_fetch_stuck_batch_default_lane_includes_unknown_lanes():
+    session = AsyncMock()
+    session.execute.return_value = MagicMock(all=MagicMock(return_value=[]))
+    cutoff = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    with patch.object(sweeper.settings, "priority_lane_weights", {"high": 2, "normal": 1}):
+        await fetch_stuck_batch(session, cutoff, None, 50, "normal")
+        await fetch_stuck_batch(session, cutoff, None, 50, "high")
+
+    default_sql, high_sql = (
+        str(call.args[0].compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        for call in session.execute.await_args_list
+    )
+    assert "content.lane IS NULL OR (content.lane NOT IN ('high'))" in default_sql
+    assert "content.lane = 'high'" in high_sql
+
+
+class TestLaneCutoffs:
+    now = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+
+    async def test_min_age_without_stream_backlog(self):
+        cutoffs = await lane_cutoffs(mock_streams({"normal": None}), self.now)
+        assert cutoffs["normal"] == self.now - timedelta(seconds=sweeper.settings.sweeper_min_age_seconds)
+
+    async def test_held_back_to_oldest_unacked_entry(self):
+        """Content newer than the lane's oldest unacked entry may still be queued there."""
+        oldest = (self.now - timedelta(hours=1)).timestamp()
+        cutoffs = await lane_cutoffs(mock_streams({"low": oldest, "high": None}), self.now)
+        margin = timedelta(seconds=sweeper.STREAM_CLOCK_MARGIN_SECONDS)
+        assert cutoffs["low"] == self.now - timedelta(hours=1) - margin
+        assert cutoffs["high"] > cutoffs["low"]
+
+
+async def test_sweep_skipped_when_lock_held():
+    engine, _ = mock_lock_engine(locked=False)
+    retry_queue = MagicMock(requeue=AsyncMock())
+
+    with patch.object(sweeper, "engine", engine):
+        assert await sweep_once(retry_queue) is None
+    retry_queue.requeue.assert_not_awaited()
+
+
+async def test_sweep_requeues_batches_and_unlocks():
+    engine, conn = mock_lock_engine(locked=True)
+    retry_queue = MagicMock(requeue=AsyncMock(side_effect=len))
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        (uuid.uuid4(), "u1", "hello", created, "acme"),
+        (uuid.uuid4(), "u2", "world", created, None),
+    ]
+    batches = AsyncMock(side_effect=[rows, rows[:1]])
+
+    with (
+        patch.object(sweeper, "engine", engine),
+        patch.object(sweeper, "LaneStreams", MagicMock(return_value=mock_streams({"low": None}))),
+        patch.object(sweeper, "async_session_maker", MagicMock()),
+        patch.object(sweeper, "fetch_stuck_batch", batches),
+        patch.object(sweeper.settings, "sweeper_batch_size", 2),
+        patch.object(sweeper.asyncio, "sleep", AsyncMock()) as sleep,
+    ):
+        assert await sweep_once(retry_queue) == 3
+
+    assert batches.await_args_list[1].args[2] == rows[-1][0]  # keyset pagination
+    assert batches.await_args_list[0].args[4] == "low"
+    sleep.assert_awaited_once()  # rate cap between full batches
+    payload = retry_queue.requeue.await_args_list[0].args[0][0]
+    assert payload["contentId"] == str(rows[0][0])
+    assert payload["text"] == "hello"
+    assert payload["tenantId"] == "acme"
+    assert payload["lane"] == "low"  # requeued into the lane it was submitted to
+    assert "tenantId" not in retry_queue.requeue.await_args_list[0].args[0][1]
+    assert "pg_advisory_unlock" in str(conn.execute.await_args_list[-1].args[0])
+
+
+async def test_sweep_counts_only_requeued_items():
+    """Content already scheduled or dead-lettered is skipped by requeue and not counted."""
+    engine, _ = mock_lock_engine(locked=True)
+    retry_queue = MagicMock(requeue=AsyncMock(return_value=0))
+    rows = [(uuid.uuid4(), "u1", "hello", datetime(2024, 1, 1, tzinfo=timezone.utc), None)]
+
+    with (
+        patch.object(sweeper, "engine", engine),
+        patch.object(sweeper, "LaneStreams", MagicMock(return_value=mock_streams({"normal": None}))),
+        patch.object(sweeper, "async_session_maker", MagicMock()),
+        patch.object(sweeper, "fetch_stuck_batch", AsyncMock(return_value=rows)),
+    ):
+        assert await sweep_once(retry_queue) == 0
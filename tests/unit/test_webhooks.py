@@ -0,0 +1,196 @@
+"""Unit tests for batched webhook delivery (endpoints stubbed with httpx.MockTransport)."""
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from src.common.config import settings
+from src.processor.consumer import _dispatch
+from src.processor.scheduler import WeightedFairScheduler
+from src.processor.webhooks import WebhookDispatcher
+
+URL = "http://hooks.test/verdicts"
+
+
+class Endpoint:
+    """Local HTTP stand-in recording delivered batches."""
+
+    def __init__(self, statuses: list[int] | None = None, delay: float = 0.0):
+        self.statuses = list(statuses or [])
+        self.delay = delay
+        self.batches: list[list[dict]] = []
+        self.requests = 0
+        self.concurrent = 0
+        self.max_concurrent = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.concurrent -= 1
+        status = self.statuses.pop(0) if self.statuses else 200
+        if status == 200:
+            self.batches.append(json.loads(request.content)["verdicts"])
+        return httpx.Response(status)
+
+
+def dispatcher_for(endpoint: Endpoint, subscriptions=None) -> WebhookDispatcher:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(endpoint))
+    return WebhookDispatcher(subscriptions or {"acme": [URL]}, client=client)
+
+
+def verdict(n: int, tenant: str = "acme") -> dict:
+    return {"contentId": f"c{n}", "tenantId": tenant, "status": "APPROVED"}
+
+
+@pytest.fixture(autouse=True)
+def fast_webhooks():
+    with (
+        patch.object(settings, "webhook_linger_seconds", 0.05),
+        patch.object(settings, "webhook_backoff_base_seconds", 0.001),
+        patch.object(settings, "webhook_backoff_max_seconds", 0.01),
+    ):
+        yield
+
+
+class TestWebhookDispatcher:
+    async def test_verdicts_coalesced_into_one_post(self):
+        endpoint = Endpoint()
+        webhooks = dispatcher_for(endpoint)
+        for n in range(5):
+            webhooks.submit(verdict(n))
+        assert await webhooks.close(timeout=1)
+
+        assert endpoint.requests == 1
+        assert [v["contentId"] for v in endpoint.batches[0]] == ["c0", "c1", "c2", "c3", "c4"]
+
+    async def test_batches_capped_at_batch_size(self):
+        endpoint = Endpoint()
+        webhooks = dispatcher_for(endpoint)
+        with patch.object(settings, "webhook_batch_size", 2):
+            for n in range(5):
+                webhooks.submit(verdict(n))
+            await webhooks.close(timeout=1)
+
+        assert sorted(len(b) for b in endpoint.batches) == [1, 2, 2]
+        assert webhooks.stats()[URL]["delivered"] == 5
+
+    async def test_only_tenant_endpoints_receive(self):
+        endpoint = Endpoint()
+        webhooks = dispatcher_for(endpoint, {"acme": [URL], "other": ["http://other.test/"]})
+        assert webhooks.submit(verdict(1, tenant="nobody")) == 0
+        assert webhooks.submit(verdict(2)) == 1
+        await webhooks.close(timeout=1)
+
+        assert [v["contentId"] for b in endpoint.batches for v in b] == ["c2"]
+        assert "http://other.test/" not in webhooks.stats()
+
+    async def test_server_errors_retried(self):
+        endpoint = Endpoint(statuses=[503, 500, 200])
+        webhooks = dispatcher_for(endpoint)
+        webhooks.submit(verdict(1))
+        await webhooks.close(timeout=1)
+
+        assert endpoint.requests == 3
+        assert webhooks.stats()[URL]["delivered"] == 1
+
+    async def test_client_errors_not_retried(self):
+        endpoint = Endpoint(statuses=[400])
+        webhooks = dispatcher_for(endpoint)
+        webhooks.submit(verdict(1))
+        await webhooks.close(timeout=1)
+
+        assert endpoint.requests == 1
+        assert webhooks.stats()[URL]["failed"] == 1
+
+    async def test_gives_up_after_max_attempts(self):
+        endpoint = Endpoint(statuses=[500] * 10)
+        webhooks = dispatcher_for(endpoint)
+        with patch.object(settings, "webhook_max_attempts", 3):
+            webhooks.submit(verdict(1))
+            await webhooks.close(timeout=1)
+
+        assert endpoint.requests == 3
+        assert webhooks.stats()[URL]["failed"] == 1
+
+    async def test_concurrency_capped_per_endpoint(self):
+        endpoint = Endpoint(delay=0.05)
+        webhooks = dispatcher_for(endpoint)
+        with (
+            patch.object(settings, "webhook_batch_size", 1),
+            patch.object(settings, "webhook_max_concurrency_per_endpoint", 2),
+        ):
+            for n in range(6):
+                webhooks.submit(verdict(n))
+            await webhooks.close(timeout=2)
+
+        assert endpoint.requests == 6
+        assert endpoint.max_concurrent == 2
+
+    async def test_slow_endpoint_drops_instead_of_blocking(self):
+        endpoint = Endpoint(delay=1.0)
+        webhooks = dispatcher_for(endpoint)
+        with (
+            patch.object(settings, "webhook_queue_size", 2),
+            patch.object(settings, "webhook_batch_size", 1),
+            patch.object(settings, "webhook_max_concurrency_per_endpoint", 1),
+        ):
+            for n in range(10):
+                webhooks.submit(verdict(n))
+            stats = webhooks.stats()[URL]
+            assert await webhooks.close(timeout=0.05) is False
+
+        assert stats["dropped"] == 8
+        assert stats["queued"] == 2
+
+    async def test_closed_dispatcher_accepts_nothing(self):
+        webhooks = dispatcher_for(Endpoint())
+        await webhooks.close(timeout=1)
+        assert webhooks.submit(verdict(1)) == 0
+
+
+class TestDispatchWebhooks:
+    async def run_dispatch(
+        self, payload: dict, written: str | None, process: AsyncMock | None = None
+    ) -> MagicMock:
+        scheduler = WeightedFairScheduler({"normal": 1})
+        webhooks = MagicMock()
+        scheduler.put("normal", (payload, None))
+        process = process or AsyncMock(return_value=written)
+        with patch("src.processor.consumer.process_message", process):
+            task = asyncio.create_task(_dispatch(scheduler, asyncio.Event(), MagicMock(), webhooks))
+            await asyncio.sleep(0.05)
+            task.cancel()
+        return webhooks
+
+    async def test_written_verdict_is_submitted(self):
+        webhooks = await self.run_dispatch(
+            {"contentId": "c1", "userId": "u1", "tenantId": "acme"}, "REJECTED"
+        )
+        event = webhooks.submit.call_args.args[0]
+        assert event["contentId"] == "c1"
+        assert event["tenantId"] == "acme"
+        assert event["status"] == "REJECTED"
+        assert event["moderatedAt"]
+
+    async def test_no_webhook_when_nothing_written(self):
+        webhooks = await self.run_dispatch({"contentId": "c1", "tenantId": "acme"}, None)
+        webhooks.submit.assert_not_called()
+
+    async def test_no_webhook_without_tenant(self):
+        webhooks = await self.run_dispatch({"contentId": "c1"}, "APPROVED")
+        webhooks.submit.assert_not_called()
+
+    async def test_inline_verdict_forwarded_without_moderation(self):
+        process = AsyncMock()
+        webhooks = await self.run_dispatch(
+            {"contentId": "c1", "tenantId": "acme", "verdict": "REJECTED"}, None, process
+        )
+        process.assert_not_awaited()
+        event = webhooks.submit.call_args.args[0]
+        assert (event["contentId"], event["status"]) == ("c1", "REJECTED")